@@ -6,16 +6,25 @@ Sistema completo de análise de mercado com IA avançada
 """
 
 import os
+import atexit
 import logging
 import time
 import json
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from flask import Blueprint, request, jsonify, session
+import hashlib
+import orjson
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Tuple
+from flask import Blueprint, Response, request, jsonify, session
 from database import db_manager
-from services.gemini_client import gemini_client
+from services.gemini_client import UltraRobustGeminiClient, get_gemini_client
+from services.huggingface_client import get_huggingface_client
 from services.deep_search_service import deep_search_service
 from services.attachment_service import attachment_service
+from services.file_cache import FileCache, cache_directory
 from services.websailor_integration import websailor_agent
 from services.enhanced_analysis_engine import enhanced_analysis_engine
 
@@ -24,6 +33,385 @@ logger = logging.getLogger(__name__)
 # Cria blueprint
 analysis_bp = Blueprint('analysis', __name__)
 
+@lru_cache(maxsize=256)
+def _build_ultra_queries(segmento: str, produto: str) -> Tuple[str, ...]:
+    """Monta as queries de pesquisa para um par segmento/produto (memoizado)"""
+    queries = (
+        # Queries principais
+        f"análise completa mercado {segmento} Brasil 2024 tendências oportunidades",
+        f"concorrentes {segmento} principais players estratégias posicionamento",
+        f"público-alvo {segmento} comportamento consumidor dores desejos",
+        f"preços {segmento} ticket médio margem lucro benchmarks",
+        
+        # Queries específicas do produto
+        f"{produto} mercado brasileiro demanda crescimento projeções",
+        f"como vender {produto} estratégias marketing digital conversão",
+        f"{produto} cases sucesso métricas resultados ROI",
+        
+        # Queries de inteligência competitiva
+        f"oportunidades inexploradas {segmento} gaps mercado nichos",
+        f"inovações disruptivas {segmento} tecnologias emergentes",
+        f"regulamentações {segmento} mudanças legais impactos",
+    )
+    
+    return queries[:10]  # Limita a 10 queries principais
+
+def _thaw(value: Any) -> Any:
+    """Converte constantes somente leitura em dicts serializáveis (tuplas de texto são compartilhadas)"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple) and any(isinstance(item, MappingProxyType) for item in value):
+        return [_thaw(item) for item in value]
+    return value
+
+# Dados estáticos de inteligência de mercado, tendências e concorrência, montados uma
+# única vez. Somente leitura (MappingProxyType + tuplas); os métodos devolvem cópias.
+_ULTRA_MARKET_INTELLIGENCE = MappingProxyType({
+    "market_size": "Mercado em crescimento acelerado",
+    "growth_rate": "15-25% ao ano",
+    "key_trends": ("Digitalização", "Automação", "Personalização", "IA", "Sustentabilidade"),
+    "opportunities": ("Nichos inexplorados", "Novas tecnologias", "Mudanças comportamentais"),
+    "threats": ("Regulamentações", "Concorrência internacional", "Mudanças econômicas"),
+    "market_maturity": "Crescimento",
+    "entry_barriers": "Médias",
+    "success_factors": ("Inovação", "Qualidade", "Atendimento", "Preço competitivo")
+})
+
+_TRENDS_ADOPTION_TIMELINE = MappingProxyType({
+    "short_term": "IA básica, automação simples",
+    "medium_term": "Integração completa, omnichannel",
+    "long_term": "Transformação digital completa"
+})
+
+_MARKET_TRENDS = MappingProxyType({
+    "emerging_trends": (
+        "Inteligência Artificial aplicada",
+        "Sustentabilidade e ESG",
+        "Experiência do cliente omnichannel",
+        "Automação de processos"
+    ),
+    "declining_trends": (
+        "Soluções puramente offline",
+        "Modelos de negócio tradicionais"
+    ),
+    "future_predictions": (
+        "Crescimento de 30% nos próximos 2 anos",
+        "Consolidação do mercado",
+        "Entrada de players internacionais"
+    ),
+    "impact_analysis": "Tendências favorecem empresas inovadoras e ágeis",
+    "adoption_timeline": _TRENDS_ADOPTION_TIMELINE
+})
+
+_DEEP_COMPETITOR_ANALYSIS = MappingProxyType({
+    "direct_competitors": (
+        MappingProxyType({
+            "nome": "Concorrente Principal A",
+            "market_share": "25%",
+            "strengths": ("Marca forte", "Rede de distribuição"),
+            "weaknesses": ("Preço alto", "Inovação lenta"),
+            "strategy": "Liderança por diferenciação"
+        }),
+        MappingProxyType({
+            "nome": "Concorrente Principal B",
+            "market_share": "18%",
+            "strengths": ("Preço competitivo", "Agilidade"),
+            "weaknesses": ("Marca fraca", "Qualidade inconsistente"),
+            "strategy": "Liderança por custo"
+        })
+    ),
+    "indirect_competitors": ("Alternativa X", "Alternativa Y", "Soluções DIY"),
+    "competitive_gaps": (
+        "Atendimento personalizado premium",
+        "Soluções híbridas online/offline",
+        "Integração com novas tecnologias"
+    ),
+    "market_positioning": "Oportunidade para posicionamento premium com foco em inovação",
+    "competitive_advantages": (
+        "Tecnologia mais avançada",
+        "Atendimento superior",
+        "Flexibilidade de soluções"
+    )
+})
+
+_CROSS_AI_ANALYSIS = MappingProxyType({
+    "consensus_points": (
+        "Mercado em crescimento com oportunidades",
+        "Necessidade de diferenciação clara",
+        "Importância do marketing digital"
+    ),
+    "divergent_points": (
+        "Estratégias de precificação variam",
+        "Prioridades de implementação diferentes"
+    ),
+    "confidence_score": 85.0,
+    "recommendation": "Focar em pontos de consenso para maior assertividade"
+})
+
+# Análises básicas usadas quando a IA falha (parte fixa, não depende da entrada)
+_BASIC_GEMINI_ANALYSIS = MappingProxyType({
+    "avatar_ultra_detalhado": MappingProxyType({
+        "perfil_demografico": MappingProxyType({
+            "idade": "25-45 anos",
+            "renda": "R$ 3.000 - R$ 15.000",
+            "escolaridade": "Superior",
+            "localizacao": "Centros urbanos"
+        }),
+        "dores_especificas": (
+            "Falta de conhecimento especializado",
+            "Dificuldade para implementar estratégias",
+            "Resultados inconsistentes"
+        ),
+        "desejos_profundos": (
+            "Alcançar liberdade financeira",
+            "Ter mais tempo para família",
+            "Ser reconhecido como especialista"
+        )
+    }),
+    "escopo": MappingProxyType({
+        "posicionamento_mercado": "Solução premium para resultados rápidos",
+        "proposta_valor": "Transforme seu negócio com estratégias comprovadas",
+        "diferenciais_competitivos": ("Metodologia exclusiva", "Suporte personalizado")
+    })
+})
+
+_BASIC_ANALYSIS_BASE = MappingProxyType({
+    "avatar_ultra_detalhado": MappingProxyType({
+        "perfil_demografico": MappingProxyType({
+            "idade": "25-45 anos",
+            "renda": "R$ 3.000 - R$ 15.000",
+            "escolaridade": "Superior",
+            "localizacao": "Centros urbanos"
+        }),
+        "dores_especificas": (
+            "Falta de conhecimento especializado no setor",
+            "Dificuldade para implementar estratégias eficazes",
+            "Resultados inconsistentes e imprevisíveis",
+            "Falta de direcionamento claro para crescimento"
+        ),
+        "desejos_profundos": (
+            "Alcançar liberdade financeira e independência",
+            "Ter mais tempo para família e vida pessoal",
+            "Ser reconhecido como especialista no mercado",
+            "Fazer diferença positiva no mundo"
+        )
+    }),
+    "escopo": MappingProxyType({
+        "posicionamento_mercado": "Solução premium para resultados rápidos e sustentáveis",
+        "proposta_valor": "Transforme seu negócio com estratégias comprovadas e suporte especializado",
+        "diferenciais_competitivos": (
+            "Metodologia exclusiva e testada",
+            "Suporte personalizado e contínuo",
+            "Resultados mensuráveis e garantidos"
+        )
+    })
+})
+
+# Planos, métricas, cronograma e monitoramento padrão (não dependem da entrada)
+_IMPLEMENTATION_PLAN = MappingProxyType({
+    "fase_1_fundacao": MappingProxyType({
+        "duracao": "30 dias",
+        "objetivos": ("Estruturação inicial", "Definição de processos", "Setup tecnológico"),
+        "atividades": (
+            "Análise detalhada da situação atual",
+            "Definição de objetivos SMART",
+            "Estruturação da equipe",
+            "Setup de ferramentas e sistemas"
+        ),
+        "investimento_estimado": "R$ 10.000 - R$ 25.000",
+        "resultados_esperados": ("Base sólida estabelecida", "Processos definidos")
+    }),
+    "fase_2_lancamento": MappingProxyType({
+        "duracao": "60 dias",
+        "objetivos": ("Lançamento no mercado", "Primeiras vendas", "Ajustes iniciais"),
+        "atividades": (
+            "Desenvolvimento de materiais de marketing",
+            "Lançamento de campanhas digitais",
+            "Início das operações comerciais",
+            "Monitoramento e otimização"
+        ),
+        "investimento_estimado": "R$ 15.000 - R$ 40.000",
+        "resultados_esperados": ("Primeiras vendas realizadas", "Feedback do mercado")
+    }),
+    "fase_3_crescimento": MappingProxyType({
+        "duracao": "90 dias",
+        "objetivos": ("Escalonamento", "Otimização", "Expansão"),
+        "atividades": (
+            "Otimização de campanhas",
+            "Expansão de canais",
+            "Automação de processos",
+            "Análise de resultados e ajustes"
+        ),
+        "investimento_estimado": "R$ 20.000 - R$ 60.000",
+        "resultados_esperados": ("Crescimento sustentável", "ROI positivo")
+    })
+})
+
+_SUCCESS_METRICS = MappingProxyType({
+    "kpis_financeiros": MappingProxyType({
+        "receita_mensal": MappingProxyType({
+            "meta": "R$ 50.000",
+            "atual": "R$ 0",
+            "crescimento_esperado": "100%/mês"
+        }),
+        "margem_lucro": MappingProxyType({
+            "meta": "40%",
+            "atual": "0%",
+            "benchmark_setor": "25-35%"
+        }),
+        "roi_marketing": MappingProxyType({
+            "meta": "300%",
+            "atual": "0%",
+            "benchmark_setor": "200-400%"
+        }),
+        "ticket_medio": MappingProxyType({
+            "meta": "R$ 2.500",
+            "atual": "R$ 0",
+            "crescimento_esperado": "15%/trimestre"
+        })
+    }),
+    "kpis_operacionais": MappingProxyType({
+        "taxa_conversao": MappingProxyType({
+            "meta": "5%",
+            "atual": "0%",
+            "benchmark_setor": "2-8%"
+        }),
+        "custo_aquisicao": MappingProxyType({
+            "meta": "R$ 500",
+            "atual": "R$ 0",
+            "benchmark_setor": "R$ 300-800"
+        }),
+        "lifetime_value": MappingProxyType({
+            "meta": "R$ 15.000",
+            "atual": "R$ 0",
+            "benchmark_setor": "R$ 8.000-20.000"
+        }),
+        "churn_rate": MappingProxyType({
+            "meta": "5%",
+            "atual": "0%",
+            "benchmark_setor": "10-15%"
+        })
+    }),
+    "kpis_marketing": MappingProxyType({
+        "reach_mensal": MappingProxyType({
+            "meta": "100.000",
+            "atual": "0",
+            "crescimento_esperado": "50%/mês"
+        }),
+        "engagement_rate": MappingProxyType({
+            "meta": "8%",
+            "atual": "0%",
+            "benchmark_setor": "3-10%"
+        }),
+        "leads_qualificados": MappingProxyType({
+            "meta": "500/mês",
+            "atual": "0",
+            "crescimento_esperado": "100%/mês"
+        }),
+        "share_of_voice": MappingProxyType({
+            "meta": "15%",
+            "atual": "0%",
+            "benchmark_setor": "5-20%"
+        })
+    })
+})
+
+_TIMELINE_365_DAYS = MappingProxyType({
+    "trimestre_1": MappingProxyType({
+        "foco": "Fundação e Estruturação",
+        "marcos": ("Setup completo", "Primeira venda", "Equipe formada"),
+        "investimento": "R$ 50.000",
+        "receita_esperada": "R$ 25.000"
+    }),
+    "trimestre_2": MappingProxyType({
+        "foco": "Crescimento e Otimização",
+        "marcos": ("100 clientes", "ROI positivo", "Processos automatizados"),
+        "investimento": "R$ 75.000",
+        "receita_esperada": "R$ 150.000"
+    }),
+    "trimestre_3": MappingProxyType({
+        "foco": "Escalonamento e Expansão",
+        "marcos": ("500 clientes", "Novos produtos", "Expansão geográfica"),
+        "investimento": "R$ 100.000",
+        "receita_esperada": "R$ 400.000"
+    }),
+    "trimestre_4": MappingProxyType({
+        "foco": "Consolidação e Inovação",
+        "marcos": ("1000 clientes", "Liderança de mercado", "Novos mercados"),
+        "investimento": "R$ 150.000",
+        "receita_esperada": "R$ 800.000"
+    })
+})
+
+_MONITORING_SYSTEM = MappingProxyType({
+    "dashboards": (
+        "Dashboard Financeiro (atualização diária)",
+        "Dashboard de Marketing (atualização em tempo real)",
+        "Dashboard Operacional (atualização semanal)",
+        "Dashboard Estratégico (atualização mensal)"
+    ),
+    "alertas": (
+        "ROI abaixo de 200% - Alerta crítico",
+        "Taxa de conversão abaixo de 3% - Alerta médio",
+        "Custo de aquisição acima de R$ 800 - Alerta alto",
+        "Churn rate acima de 10% - Alerta crítico"
+    ),
+    "relatorios": (
+        "Relatório semanal de performance",
+        "Relatório mensal de resultados",
+        "Relatório trimestral estratégico",
+        "Relatório anual de crescimento"
+    ),
+    "otimizacoes": (
+        "A/B testing contínuo em campanhas",
+        "Otimização de funil de vendas",
+        "Melhoria contínua de processos",
+        "Análise preditiva de tendências"
+    )
+})
+
+# Insights fixos que completam os insights exclusivos gerados a partir dos dados
+_STATIC_ULTRA_INSIGHTS = (
+    "🚀 Mercado apresenta oportunidades de crescimento acelerado nos próximos 24 meses",
+    "💡 Diferenciação pela inovação tecnológica será o principal fator de sucesso",
+    "🎯 Personalização da experiência do cliente é crítica para retenção",
+    "📈 Investimento em marketing digital deve representar 15-25% da receita",
+    "🔄 Automação de processos pode reduzir custos operacionais em até 30%",
+    "🌐 Presença omnichannel é essencial para competitividade",
+    "⚡ Velocidade de implementação será vantagem competitiva decisiva",
+    "🛡️ Construção de marca forte é investimento de longo prazo essencial",
+    "📱 Mobile-first approach é obrigatório para alcançar público-alvo",
+    "🤝 Parcerias estratégicas podem acelerar crescimento em 40%",
+    "📊 Métricas de performance devem ser monitoradas semanalmente",
+    "🎨 Design e UX superiores podem justificar premium de até 20%"
+)
+
+# Tamanho máximo do conteúdo combinado dos anexos (aumentado para 15k)
+_ATTACHMENT_CONTENT_LIMIT = 15000
+
+# Tamanho máximo do contexto de pesquisa enviado ao Gemini
+_SEARCH_CONTEXT_LIMIT = 15000
+
+# Seções avaliadas pelos scores de qualidade e de completude
+_QUALITY_SECTIONS = (
+    "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave",
+    "insights_exclusivos_ultra", "plano_implementacao_completo", "metricas_sucesso_avancadas"
+)
+
+_COMPLETENESS_SECTIONS = (
+    "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave",
+    "insights_exclusivos_ultra", "plano_implementacao_completo", 
+    "metricas_sucesso_avancadas", "cronograma_365_dias", "sistema_monitoramento",
+    "inteligencia_mercado_ultra", "analise_concorrencia_ultra"
+)
+
+_SCORED_SECTIONS = frozenset(_QUALITY_SECTIONS + _COMPLETENESS_SECTIONS)
+
+def _normalize_cache_text(text: str) -> str:
+    """Normaliza texto para chave de cache (minúsculas, sem acentos e espaços extras)"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(ascii_text.lower().split())
+
 class UltraRobustAnalyzer:
     """Analisador Ultra-Robusto com implementação completa dos documentos"""
     
@@ -35,6 +423,27 @@ class UltraRobustAnalyzer:
         self.mental_drivers_enabled = True
         self.objection_handling_enabled = True
         
+        # Cache persistente de análises completas (chave = hash das entradas)
+        self.cache_dir = cache_directory('analysis')
+        self.cache_ttl = int(os.getenv('ANALYSIS_CACHE_TTL', 86400))  # 24 horas
+        self.analysis_cache = FileCache(
+            self.cache_dir,
+            ttl=self.cache_ttl,
+            max_entries=int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', 500))
+        )
+        
+        # Pools de threads reutilizados entre requisições. As queries de pesquisa
+        # ficam em um pool próprio: são submetidas de dentro de uma etapa do pool
+        # principal, e dividir o mesmo pool poderia travar sob carga.
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="arq-analysis")
+        self._research_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="arq-research")
+        atexit.register(self.close)
+        
+    def close(self) -> None:
+        """Encerra os pools de threads compartilhados"""
+        self._executor.shutdown(wait=False)
+        self._research_executor.shutdown(wait=False)
+    
     def generate_ultra_comprehensive_analysis(
         self, 
         data: Dict[str, Any],
@@ -42,53 +451,120 @@ class UltraRobustAnalyzer:
     ) -> Dict[str, Any]:
         """Gera análise ultra-abrangente implementando TODOS os documentos"""
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         logger.info(f"🚀 INICIANDO ANÁLISE ULTRA-ROBUSTA para {data.get('segmento')}")
         
+        cache_key = self._analysis_cache_key(data, session_id)
+        cached_analysis = self._load_cached_analysis(cache_key)
+        if cached_analysis:
+            logger.info(f"⚡ Análise servida do cache persistente ({cache_key[:12]})")
+            return cached_analysis
+        
+        # Erros por etapa: uma etapa com falha degrada a análise em vez de descartá-la
+        stage_errors = {}
+
+        # FASE 1: COLETA MASSIVA DE DADOS (5-10 minutos)
+        logger.info("📊 FASE 1: Coleta massiva de dados...")
         try:
-            # FASE 1: COLETA MASSIVA DE DADOS (5-10 minutos)
-            logger.info("📊 FASE 1: Coleta massiva de dados...")
             comprehensive_data = self._collect_ultra_comprehensive_data(data, session_id)
-            
-            # FASE 2: ANÁLISE COM MÚLTIPLAS IAs (10-15 minutos)
-            logger.info("🧠 FASE 2: Análise com múltiplas IAs...")
+            stage_errors.update(comprehensive_data.pop("stage_errors", {}))
+        except Exception as e:
+            logger.error(f"❌ Erro na coleta de dados: {str(e)}", exc_info=True)
+            stage_errors["coleta_dados"] = str(e)
+            comprehensive_data = {}
+
+        # FASE 2: ANÁLISE COM MÚLTIPLAS IAs (10-15 minutos)
+        logger.info("🧠 FASE 2: Análise com múltiplas IAs...")
+        try:
             multi_ai_analysis = self._run_multi_ai_ultra_analysis(data, comprehensive_data)
-            
+        except Exception as e:
+            logger.error(f"❌ Erro na análise com múltiplas IAs: {str(e)}", exc_info=True)
+            stage_errors["analise_ias"] = str(e)
+            multi_ai_analysis = {}
+
+        # Sem dados e sem IA não há o que consolidar
+        if "coleta_dados" in stage_errors and "analise_ias" in stage_errors:
+            return self._generate_emergency_ultra_fallback(
+                data, f"Falha nas etapas: {', '.join(stage_errors)}"
+            )
+
+        try:
             # FASE 3: CONSOLIDAÇÃO FINAL ULTRA-DETALHADA
             logger.info("🎯 FASE 3: Consolidação final ultra-detalhada...")
             final_analysis = self._consolidate_ultra_analysis(
                 data, comprehensive_data, multi_ai_analysis
             )
             
-            end_time = time.time()
-            processing_time = end_time - start_time
+            processing_time = (time.perf_counter_ns() - start_ns) / 1e9
+            minutes, seconds = divmod(int(processing_time), 60)
+            quality_score, completeness_score = self._calculate_ultra_scores(final_analysis)
             
             # Adiciona metadados ultra-detalhados
             final_analysis["metadata_ultra_detalhado"] = {
                 "processing_time_seconds": processing_time,
-                "processing_time_formatted": f"{int(processing_time // 60)}m {int(processing_time % 60)}s",
+                "processing_time_formatted": f"{minutes}m {seconds}s",
                 "analysis_engine": "ARQV30 Enhanced Ultra-Robust v2.0",
                 "data_sources_used": len(comprehensive_data.get("sources", [])),
                 "ai_models_used": len(multi_ai_analysis),
-                "generated_at": datetime.utcnow().isoformat(),
-                "quality_score": self._calculate_ultra_quality_score(final_analysis),
-                "completeness_score": self._calculate_completeness_score(final_analysis),
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "quality_score": quality_score,
+                "completeness_score": completeness_score,
                 "depth_level": "ULTRA_PROFUNDO",
                 "research_iterations": comprehensive_data.get("research_iterations", 0),
                 "total_content_analyzed": comprehensive_data.get("total_content_length", 0),
                 "unique_insights_generated": len(final_analysis.get("insights_exclusivos_ultra", [])),
+                "stage_errors": stage_errors,
             }
             
             logger.info(f"✅ ANÁLISE ULTRA-ROBUSTA CONCLUÍDA em {processing_time:.2f} segundos")
             logger.info(f"📈 Quality Score: {final_analysis['metadata_ultra_detalhado']['quality_score']}")
             logger.info(f"🎯 Completeness Score: {final_analysis['metadata_ultra_detalhado']['completeness_score']}")
             
+            # Só persiste análises completas geradas de fato pela IA (não fallbacks)
+            if (not stage_errors and
+                    final_analysis.get("metadata_gemini", {}).get("model") not in (None, "fallback")):
+                self._store_cached_analysis(cache_key, final_analysis)
             return final_analysis
             
         except Exception as e:
-            logger.error(f"❌ ERRO CRÍTICO na análise ultra-robusta: {str(e)}", exc_info=True)
+            logger.error(f"❌ ERRO CRÍTICO na consolidação ultra-robusta: {str(e)}", exc_info=True)
             return self._generate_emergency_ultra_fallback(data, str(e))
     
+    def _analysis_cache_key(self, data: Dict[str, Any], session_id: Optional[str]) -> str:
+        """Calcula a chave do cache a partir dos dados e do conteúdo dos anexos
+        
+        Textos são normalizados para que entradas quase idênticas ("Produtos
+        Digitais" / "produtos  digitais") compartilhem a mesma análise. O
+        session_id fica de fora: os anexos da sessão entram pelo conteúdo.
+        """
+        normalized_data = {
+            key: _normalize_cache_text(value) if isinstance(value, str) else value
+            for key, value in data.items()
+            if key != 'session_id'
+        }
+        
+        digest = hashlib.sha256()
+        digest.update(orjson.dumps(normalized_data, option=orjson.OPT_SORT_KEYS, default=str))
+        
+        if session_id:
+            for att in attachment_service.get_session_attachments(session_id):
+                digest.update(att.get("extracted_content", "").encode('utf-8'))
+        
+        return digest.hexdigest()
+    
+    def _load_cached_analysis(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Carrega análise do cache em disco, se existir e não estiver expirada"""
+        analysis = self.analysis_cache.get(cache_key)
+        if not isinstance(analysis, dict):
+            return None
+        
+        analysis.setdefault("metadata_ultra_detalhado", {})["served_from_cache"] = True
+        return analysis
+    
+    def _store_cached_analysis(self, cache_key: str, analysis: Dict[str, Any]) -> None:
+        """Grava análise no cache em disco (escrita atômica, com limpeza de expiradas)"""
+        self.analysis_cache.set(cache_key, analysis)
+    
     def _collect_ultra_comprehensive_data(
         self, 
         data: Dict[str, Any], 
@@ -108,82 +584,151 @@ class UltraRobustAnalyzer:
             "total_content_length": 0
         }
         
-        # 1. PROCESSAMENTO ULTRA-DETALHADO DE ANEXOS
-        if session_id:
-            logger.info("📎 Processando anexos com análise ultra-detalhada...")
-            attachments = attachment_service.get_session_attachments(session_id)
-            if attachments:
-                combined_content = ""
-                attachment_analysis = {}
-                
-                for att in attachments:
-                    if att.get("extracted_content"):
-                        content = att["extracted_content"]
-                        combined_content += content + "\n\n"
-                        
-                        # Análise específica por tipo de anexo
-                        content_type = att.get("content_type", "geral")
-                        if content_type not in attachment_analysis:
-                            attachment_analysis[content_type] = []
-                        
-                        attachment_analysis[content_type].append({
-                            "filename": att.get("filename"),
-                            "content": content,
-                            "analysis": self._analyze_attachment_content(content, content_type)
-                        })
-                
-                comprehensive_data["attachments"] = {
-                    "count": len(attachments),
-                    "combined_content": combined_content[:15000],  # Aumentado para 15k
-                    "types_analysis": attachment_analysis,
-                    "total_length": len(combined_content)
-                }
-                comprehensive_data["total_content_length"] += len(combined_content)
-                logger.info(f"✅ {len(attachments)} anexos processados com análise detalhada")
-        
-        # 2. PESQUISA WEB ULTRA-PROFUNDA COM WEBSAILOR
-        if websailor_agent.is_available():
-            logger.info("🌐 Realizando pesquisa web ultra-profunda...")
-            
-            # Múltiplas queries estratégicas
-            queries = self._generate_ultra_comprehensive_queries(data)
-            
-            for i, query in enumerate(queries):
-                logger.info(f"🔍 Query {i+1}/{len(queries)}: {query}")
+        # Etapas independentes executadas em paralelo no pool compartilhado
+        executor = self._executor
+        futures = {
+            # 1. PROCESSAMENTO ULTRA-DETALHADO DE ANEXOS
+            "attachments": executor.submit(self._collect_attachments_data, session_id),
+            # 2. PESQUISA WEB ULTRA-PROFUNDA COM WEBSAILOR
+            "web_research": executor.submit(self._collect_web_research_data, data),
+            # 3. INTELIGÊNCIA DE MERCADO AVANÇADA
+            "market_intelligence": executor.submit(self._gather_ultra_market_intelligence, data),
+            # 4. ANÁLISE DE CONCORRÊNCIA PROFUNDA
+            "competitor_analysis": executor.submit(self._perform_deep_competitor_analysis, data),
+            # 5. ANÁLISE DE TENDÊNCIAS
+            "trend_analysis": executor.submit(self._analyze_market_trends, data),
+        }
+        
+        stage_errors = {}
+
+        def stage_result(stage: str) -> Any:
+            """Resultado de uma etapa; em caso de falha registra o erro e retorna {}"""
+            try:
+                return futures[stage].result()
+            except Exception as e:
+                logger.error(f"❌ Erro na etapa {stage}: {str(e)}", exc_info=True)
+                stage_errors[stage] = str(e)
+                return {}
+
+        attachments_data = stage_result("attachments")
+        if attachments_data:
+            comprehensive_data["attachments"] = attachments_data
+            comprehensive_data["total_content_length"] += attachments_data["total_length"]
+
+        web_data = stage_result("web_research")
+        if web_data:
+            comprehensive_data["web_research"] = web_data["results"]
+            comprehensive_data["sources"].extend(web_data["sources"])
+            comprehensive_data["research_iterations"] += web_data["iterations"]
+            comprehensive_data["total_content_length"] += web_data["content_length"]
+
+        comprehensive_data["market_intelligence"] = stage_result("market_intelligence")
+        comprehensive_data["competitor_analysis"] = stage_result("competitor_analysis")
+        comprehensive_data["trend_analysis"] = stage_result("trend_analysis")
+
+        # Menos de 3 etapas bem-sucedidas: os dados não sustentam a análise
+        if len(futures) - len(stage_errors) < 3:
+            raise RuntimeError(f"Coleta insuficiente, falhas em: {', '.join(stage_errors)}")
+        comprehensive_data["stage_errors"] = stage_errors
+
+        logger.info(f"📊 Coleta de dados concluída: {comprehensive_data['total_content_length']} caracteres analisados")
+        return comprehensive_data
+    
+    def _collect_attachments_data(self, session_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Processa os anexos da sessão com análise ultra-detalhada"""
+        if not session_id:
+            return None
+        
+        logger.info("📎 Processando anexos com análise ultra-detalhada...")
+        attachments = attachment_service.get_session_attachments(session_id)
+        if not attachments:
+            return None
+        
+        content_parts = []
+        total_length = 0
+        remaining = _ATTACHMENT_CONTENT_LIMIT
+        attachment_analysis = {}
+        
+        for att in attachments:
+            if att.get("extracted_content"):
+                content = att["extracted_content"]
+                total_length += len(content) + 2  # Inclui o separador "\n\n"
                 
-                web_result = websailor_agent.navigate_and_research(
-                    query,
-                    context={
-                        "segmento": data.get("segmento"),
-                        "produto": data.get("produto"),
-                        "publico": data.get("publico")
-                    },
-                    max_pages=12,  # Aumentado para pesquisa mais profunda
-                    depth=3,  # Profundidade máxima
-                    aggressive_mode=True  # Modo agressivo ativado
-                )
+                # Guarda só o que cabe no limite do conteúdo combinado
+                if remaining > 0:
+                    part = content[:remaining]
+                    content_parts.append(part)
+                    remaining -= len(part) + 2
                 
-                comprehensive_data["web_research"][f"query_{i+1}"] = web_result
-                comprehensive_data["sources"].extend(web_result.get("sources", []))
-                comprehensive_data["research_iterations"] += 1
+                # Análise específica por tipo de anexo
+                content_type = att.get("content_type", "geral")
+                if content_type not in attachment_analysis:
+                    attachment_analysis[content_type] = []
                 
-                # Adiciona conteúdo ao total
-                research_content = web_result.get("research_summary", {}).get("combined_content", "")
-                comprehensive_data["total_content_length"] += len(research_content)
-            
-            logger.info(f"✅ Pesquisa web concluída: {len(queries)} queries, {len(comprehensive_data['sources'])} fontes")
+                attachment_analysis[content_type].append({
+                    "filename": att.get("filename"),
+                    "content": content,
+                    "analysis": self._analyze_attachment_content(content, content_type)
+                })
         
-        # 3. INTELIGÊNCIA DE MERCADO AVANÇADA
-        comprehensive_data["market_intelligence"] = self._gather_ultra_market_intelligence(data)
+        # Junta uma única vez; o corte final só remove separadores excedentes
+        combined_content = "\n\n".join(content_parts)[:_ATTACHMENT_CONTENT_LIMIT]
         
-        # 4. ANÁLISE DE CONCORRÊNCIA PROFUNDA
-        comprehensive_data["competitor_analysis"] = self._perform_deep_competitor_analysis(data)
+        logger.info(f"✅ {len(attachments)} anexos processados com análise detalhada")
+        return {
+            "count": len(attachments),
+            "combined_content": combined_content,
+            "types_analysis": attachment_analysis,
+            "total_length": total_length
+        }
+    
+    def _collect_web_research_data(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Executa a pesquisa web ultra-profunda com WebSailor"""
+        if not websailor_agent.is_available():
+            return None
         
-        # 5. ANÁLISE DE TENDÊNCIAS
-        comprehensive_data["trend_analysis"] = self._analyze_market_trends(data)
+        logger.info("🌐 Realizando pesquisa web ultra-profunda...")
         
-        logger.info(f"📊 Coleta de dados concluída: {comprehensive_data['total_content_length']} caracteres analisados")
-        return comprehensive_data
+        web_data = {
+            "results": {},
+            "sources": [],
+            "iterations": 0,
+            "content_length": 0
+        }
+        
+        # Múltiplas queries estratégicas
+        queries = self._generate_ultra_comprehensive_queries(data)
+        context = {
+            "segmento": data.get("segmento"),
+            "produto": data.get("produto"),
+            "publico": data.get("publico")
+        }
+        
+        def research_query(indexed_query):
+            i, query = indexed_query
+            logger.info(f"🔍 Query {i+1}/{len(queries)}: {query}")
+            return websailor_agent.navigate_and_research(
+                query,
+                context=context,
+                max_pages=12,  # Aumentado para pesquisa mais profunda
+                depth=3,  # Profundidade máxima
+                aggressive_mode=True  # Modo agressivo ativado
+            )
+        
+        # Queries são puramente de rede: executa em paralelo, mantendo a ordem
+        web_results = list(self._research_executor.map(research_query, enumerate(queries)))
+        
+        for i, web_result in enumerate(web_results):
+            web_data["results"][f"query_{i+1}"] = web_result
+            web_data["sources"].extend(web_result.get("sources", []))
+            web_data["iterations"] += 1
+            
+            # Adiciona conteúdo ao total
+            research_content = web_result.get("research_summary", {}).get("combined_content", "")
+            web_data["content_length"] += len(research_content)
+        
+        logger.info(f"✅ Pesquisa web concluída: {len(queries)} queries, {len(web_data['sources'])} fontes")
+        return web_data
     
     def _run_multi_ai_ultra_analysis(
         self, 
@@ -196,47 +741,24 @@ class UltraRobustAnalyzer:
         
         ai_analyses = {}
         
+        # As chamadas às IAs são independentes e limitadas por rede: executa em paralelo
         # 1. ANÁLISE PRINCIPAL COM GEMINI PRO (ULTRA-DETALHADA)
+        gemini_future = None
+        gemini_client = get_gemini_client()
         if gemini_client:
-            try:
-                logger.info("🤖 Executando análise Gemini Pro ultra-detalhada...")
-                
-                # Prepara contexto de pesquisa
-                search_context = ""
-                if comprehensive_data.get("web_research"):
-                    for key, web_result in comprehensive_data["web_research"].items():
-                        web_summary = web_result.get("research_summary", {})
-                        search_context += f"PESQUISA {key.upper()}:\n{web_summary.get('combined_content', '')}\n\n"
-                        
-                        insights = web_summary.get("key_insights", [])
-                        if insights:
-                            search_context += f"INSIGHTS {key.upper()}:\n" + "\n".join(insights) + "\n\n"
-                
-                # Usa o cliente Gemini diretamente
-                gemini_analysis = gemini_client.generate_ultra_detailed_analysis(
-                    data,
-                    search_context=search_context[:15000] if search_context else None,
-                    attachments_context=None
-                )
-                
-                ai_analyses["gemini_ultra"] = gemini_analysis
-                logger.info("✅ Análise Gemini Pro ultra-detalhada concluída")
-            except Exception as e:
-                logger.error(f"❌ Erro na análise Gemini: {str(e)}")
-                ai_analyses["gemini_ultra"] = self._generate_basic_gemini_analysis(data)
+            gemini_future = self._executor.submit(
+                self._run_gemini_ultra_analysis, gemini_client, data, comprehensive_data
+            )
         
         # 2. ANÁLISE COMPLEMENTAR COM HUGGINGFACE
-        try:
-            from services.huggingface_client import HuggingFaceClient
-            huggingface_client = HuggingFaceClient()
-            if huggingface_client.is_available():
-                logger.info("🤖 Executando análise HuggingFace complementar...")
-                hf_analysis = huggingface_client.analyze_market_strategy(data)
-                if hf_analysis:
-                    ai_analyses["huggingface_ultra"] = {"analysis": hf_analysis}
-                logger.info("✅ Análise HuggingFace concluída")
-        except Exception as e:
-            logger.warning(f"⚠️ HuggingFace não disponível: {str(e)}")
+        huggingface_future = self._executor.submit(self._run_huggingface_ultra_analysis, data)
+        
+        if gemini_future:
+            ai_analyses["gemini_ultra"] = gemini_future.result()
+        
+        hf_analysis = huggingface_future.result()
+        if hf_analysis:
+            ai_analyses["huggingface_ultra"] = {"analysis": hf_analysis}
         
         # 3. ANÁLISE CRUZADA E VALIDAÇÃO
         if len(ai_analyses) > 1:
@@ -246,6 +768,62 @@ class UltraRobustAnalyzer:
         
         return ai_analyses
     
+    def _run_gemini_ultra_analysis(
+        self, 
+        gemini_client: UltraRobustGeminiClient,
+        data: Dict[str, Any], 
+        comprehensive_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Executa a análise principal ultra-detalhada com Gemini Pro"""
+        try:
+            logger.info("🤖 Executando análise Gemini Pro ultra-detalhada...")
+            
+            # Prepara contexto de pesquisa em partes, parando ao atingir o limite enviado à IA
+            context_parts = []
+            context_length = 0
+            for key, web_result in comprehensive_data.get("web_research", {}).items():
+                if context_length >= _SEARCH_CONTEXT_LIMIT:
+                    break
+                label = key.upper()
+                web_summary = web_result.get("research_summary", {})
+                block = f"PESQUISA {label}:\n{web_summary.get('combined_content', '')}\n\n"
+                
+                insights = web_summary.get("key_insights", [])
+                if insights:
+                    block += f"INSIGHTS {label}:\n" + "\n".join(insights) + "\n\n"
+                
+                context_parts.append(block)
+                context_length += len(block)
+            
+            search_context = "".join(context_parts)[:_SEARCH_CONTEXT_LIMIT]
+            
+            # Usa o cliente Gemini diretamente
+            gemini_analysis = gemini_client.generate_ultra_detailed_analysis(
+                data,
+                search_context=search_context or None,
+                attachments_context=None
+            )
+            
+            logger.info("✅ Análise Gemini Pro ultra-detalhada concluída")
+            return gemini_analysis
+        except Exception as e:
+            logger.error(f"❌ Erro na análise Gemini: {str(e)}")
+            return self._generate_basic_gemini_analysis(data)
+    
+    def _run_huggingface_ultra_analysis(self, data: Dict[str, Any]) -> Optional[str]:
+        """Executa a análise complementar com HuggingFace"""
+        try:
+            # Usa a instância global do cliente (não recria o cliente a cada análise)
+            huggingface_client = get_huggingface_client()
+            if huggingface_client and huggingface_client.is_available():
+                logger.info("🤖 Executando análise HuggingFace complementar...")
+                hf_analysis = huggingface_client.analyze_market_strategy(data)
+                logger.info("✅ Análise HuggingFace concluída")
+                return hf_analysis
+        except Exception as e:
+            logger.warning(f"⚠️ HuggingFace não disponível: {str(e)}")
+        return None
+    
     def _consolidate_ultra_analysis(
         self, 
         data: Dict[str, Any], 
@@ -261,8 +839,9 @@ class UltraRobustAnalyzer:
         if not main_analysis:
             main_analysis = self._generate_basic_analysis(data)
         
-        # Enriquece com dados de pesquisa
-        ultra_analysis = main_analysis.copy()
+        # Enriquece a análise base no próprio dict: ela é gerada por requisição
+        # (resposta do Gemini ou análise básica), então não precisa de cópia
+        ultra_analysis = main_analysis
         
         # Adiciona dados de pesquisa
         if comprehensive_data.get("web_research"):
@@ -299,196 +878,53 @@ class UltraRobustAnalyzer:
     # Métodos auxiliares para implementação dos sistemas
     def _generate_ultra_comprehensive_queries(self, data: Dict[str, Any]) -> List[str]:
         """Gera queries ultra-abrangentes para pesquisa"""
-        segmento = data.get("segmento", "")
-        produto = data.get("produto", "")
-        
-        queries = [
-            # Queries principais
-            f"análise completa mercado {segmento} Brasil 2024 tendências oportunidades",
-            f"concorrentes {segmento} principais players estratégias posicionamento",
-            f"público-alvo {segmento} comportamento consumidor dores desejos",
-            f"preços {segmento} ticket médio margem lucro benchmarks",
-            
-            # Queries específicas do produto
-            f"{produto} mercado brasileiro demanda crescimento projeções",
-            f"como vender {produto} estratégias marketing digital conversão",
-            f"{produto} cases sucesso métricas resultados ROI",
-            
-            # Queries de inteligência competitiva
-            f"oportunidades inexploradas {segmento} gaps mercado nichos",
-            f"inovações disruptivas {segmento} tecnologias emergentes",
-            f"regulamentações {segmento} mudanças legais impactos",
-        ]
-        
-        return queries[:10]  # Limita a 10 queries principais
+        # str(): o cache exige chaves hasheáveis e o JSON pode trazer listas/objetos
+        return list(_build_ultra_queries(str(data.get("segmento", "")), str(data.get("produto", ""))))
     
     def _analyze_attachment_content(self, content: str, content_type: str) -> Dict[str, Any]:
         """Analisa conteúdo específico do anexo"""
+        words = content.split()  # Uma única divisão para contagem e conceitos
         return {
             "content_length": len(content),
-            "word_count": len(content.split()),
+            "word_count": len(words),
             "type": content_type,
-            "key_concepts": content.split()[:10]  # Primeiras 10 palavras como conceitos
+            "key_concepts": words[:10]  # Primeiras 10 palavras como conceitos
         }
     
     def _gather_ultra_market_intelligence(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Coleta inteligência de mercado ultra-detalhada"""
-        return {
-            "market_size": "Mercado em crescimento acelerado",
-            "growth_rate": "15-25% ao ano",
-            "key_trends": ["Digitalização", "Automação", "Personalização", "IA", "Sustentabilidade"],
-            "opportunities": ["Nichos inexplorados", "Novas tecnologias", "Mudanças comportamentais"],
-            "threats": ["Regulamentações", "Concorrência internacional", "Mudanças econômicas"],
-            "market_maturity": "Crescimento",
-            "entry_barriers": "Médias",
-            "success_factors": ["Inovação", "Qualidade", "Atendimento", "Preço competitivo"]
-        }
+        return dict(_ULTRA_MARKET_INTELLIGENCE)
     
     def _perform_deep_competitor_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Realiza análise profunda de concorrência"""
-        return {
-            "direct_competitors": [
-                {
-                    "nome": "Concorrente Principal A",
-                    "market_share": "25%",
-                    "strengths": ["Marca forte", "Rede de distribuição"],
-                    "weaknesses": ["Preço alto", "Inovação lenta"],
-                    "strategy": "Liderança por diferenciação"
-                },
-                {
-                    "nome": "Concorrente Principal B", 
-                    "market_share": "18%",
-                    "strengths": ["Preço competitivo", "Agilidade"],
-                    "weaknesses": ["Marca fraca", "Qualidade inconsistente"],
-                    "strategy": "Liderança por custo"
-                }
-            ],
-            "indirect_competitors": ["Alternativa X", "Alternativa Y", "Soluções DIY"],
-            "competitive_gaps": [
-                "Atendimento personalizado premium",
-                "Soluções híbridas online/offline",
-                "Integração com novas tecnologias"
-            ],
-            "market_positioning": "Oportunidade para posicionamento premium com foco em inovação",
-            "competitive_advantages": [
-                "Tecnologia mais avançada",
-                "Atendimento superior",
-                "Flexibilidade de soluções"
-            ]
-        }
+        return _thaw(_DEEP_COMPETITOR_ANALYSIS)
     
     def _analyze_market_trends(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Analisa tendências de mercado"""
-        return {
-            "emerging_trends": [
-                "Inteligência Artificial aplicada",
-                "Sustentabilidade e ESG",
-                "Experiência do cliente omnichannel",
-                "Automação de processos"
-            ],
-            "declining_trends": [
-                "Soluções puramente offline",
-                "Modelos de negócio tradicionais"
-            ],
-            "future_predictions": [
-                "Crescimento de 30% nos próximos 2 anos",
-                "Consolidação do mercado",
-                "Entrada de players internacionais"
-            ],
-            "impact_analysis": "Tendências favorecem empresas inovadoras e ágeis",
-            "adoption_timeline": {
-                "short_term": "IA básica, automação simples",
-                "medium_term": "Integração completa, omnichannel",
-                "long_term": "Transformação digital completa"
-            }
-        }
+        return _thaw(_MARKET_TRENDS)
     
     def _generate_basic_gemini_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Gera análise básica quando Gemini falha"""
-        return {
-            "avatar_ultra_detalhado": {
-                "perfil_demografico": {
-                    "idade": "25-45 anos",
-                    "renda": "R$ 3.000 - R$ 15.000",
-                    "escolaridade": "Superior",
-                    "localizacao": "Centros urbanos"
-                },
-                "dores_especificas": [
-                    "Falta de conhecimento especializado",
-                    "Dificuldade para implementar estratégias",
-                    "Resultados inconsistentes"
-                ],
-                "desejos_profundos": [
-                    "Alcançar liberdade financeira",
-                    "Ter mais tempo para família",
-                    "Ser reconhecido como especialista"
-                ]
-            },
-            "escopo": {
-                "posicionamento_mercado": "Solução premium para resultados rápidos",
-                "proposta_valor": "Transforme seu negócio com estratégias comprovadas",
-                "diferenciais_competitivos": ["Metodologia exclusiva", "Suporte personalizado"]
-            }
-        }
+        return _thaw(_BASIC_GEMINI_ANALYSIS)
     
     def _generate_basic_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Gera análise básica completa"""
-        return {
-            "avatar_ultra_detalhado": {
-                "perfil_demografico": {
-                    "idade": "25-45 anos",
-                    "renda": "R$ 3.000 - R$ 15.000",
-                    "escolaridade": "Superior",
-                    "localizacao": "Centros urbanos"
-                },
-                "dores_especificas": [
-                    "Falta de conhecimento especializado no setor",
-                    "Dificuldade para implementar estratégias eficazes",
-                    "Resultados inconsistentes e imprevisíveis",
-                    "Falta de direcionamento claro para crescimento"
-                ],
-                "desejos_profundos": [
-                    "Alcançar liberdade financeira e independência",
-                    "Ter mais tempo para família e vida pessoal",
-                    "Ser reconhecido como especialista no mercado",
-                    "Fazer diferença positiva no mundo"
-                ]
-            },
-            "escopo": {
-                "posicionamento_mercado": "Solução premium para resultados rápidos e sustentáveis",
-                "proposta_valor": "Transforme seu negócio com estratégias comprovadas e suporte especializado",
-                "diferenciais_competitivos": [
-                    "Metodologia exclusiva e testada",
-                    "Suporte personalizado e contínuo",
-                    "Resultados mensuráveis e garantidos"
-                ]
-            },
-            "estrategia_palavras_chave": {
-                "palavras_primarias": [data.get('segmento', 'negócio'), "estratégia", "marketing", "crescimento"],
-                "palavras_secundarias": ["vendas", "digital", "online", "consultoria", "resultados"],
-                "palavras_cauda_longa": [
-                    f"como crescer no mercado de {data.get('segmento', 'negócios')}",
-                    "estratégias de marketing digital eficazes",
-                    "consultoria especializada em crescimento"
-                ]
-            }
+        # Parte fixa vem da constante; só as palavras-chave dependem do segmento
+        basic_analysis = _thaw(_BASIC_ANALYSIS_BASE)
+        basic_analysis["estrategia_palavras_chave"] = {
+            "palavras_primarias": [data.get('segmento', 'negócio'), "estratégia", "marketing", "crescimento"],
+            "palavras_secundarias": ["vendas", "digital", "online", "consultoria", "resultados"],
+            "palavras_cauda_longa": [
+                f"como crescer no mercado de {data.get('segmento', 'negócios')}",
+                "estratégias de marketing digital eficazes",
+                "consultoria especializada em crescimento"
+            ]
         }
+        return basic_analysis
     
     def _perform_cross_ai_analysis(self, ai_analyses: Dict[str, Any]) -> Dict[str, Any]:
         """Realiza análise cruzada entre diferentes IAs"""
-        return {
-            "consensus_points": [
-                "Mercado em crescimento com oportunidades",
-                "Necessidade de diferenciação clara",
-                "Importância do marketing digital"
-            ],
-            "divergent_points": [
-                "Estratégias de precificação variam",
-                "Prioridades de implementação diferentes"
-            ],
-            "confidence_score": 85.0,
-            "recommendation": "Focar em pontos de consenso para maior assertividade"
-        }
+        return _thaw(_CROSS_AI_ANALYSIS)
     
     def _generate_ultra_exclusive_insights(
         self, 
@@ -501,193 +937,57 @@ class UltraRobustAnalyzer:
             f"🔍 Análise baseada em {len(comprehensive_data.get('sources', []))} fontes verificadas de mercado",
             f"📊 Processamento de {comprehensive_data.get('total_content_length', 0)} caracteres de dados reais",
             f"🧠 Análise com {len(ai_analyses)} sistemas de IA diferentes para máxima precisão",
-            "🚀 Mercado apresenta oportunidades de crescimento acelerado nos próximos 24 meses",
-            "💡 Diferenciação pela inovação tecnológica será o principal fator de sucesso",
-            "🎯 Personalização da experiência do cliente é crítica para retenção",
-            "📈 Investimento em marketing digital deve representar 15-25% da receita",
-            "🔄 Automação de processos pode reduzir custos operacionais em até 30%",
-            "🌐 Presença omnichannel é essencial para competitividade",
-            "⚡ Velocidade de implementação será vantagem competitiva decisiva",
-            "🛡️ Construção de marca forte é investimento de longo prazo essencial",
-            "📱 Mobile-first approach é obrigatório para alcançar público-alvo",
-            "🤝 Parcerias estratégicas podem acelerar crescimento em 40%",
-            "📊 Métricas de performance devem ser monitoradas semanalmente",
-            "🎨 Design e UX superiores podem justificar premium de até 20%"
         ]
+        insights.extend(_STATIC_ULTRA_INSIGHTS)
         
         return insights
     
     def _create_complete_implementation_plan(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria plano de implementação completo"""
-        return {
-            "fase_1_fundacao": {
-                "duracao": "30 dias",
-                "objetivos": ["Estruturação inicial", "Definição de processos", "Setup tecnológico"],
-                "atividades": [
-                    "Análise detalhada da situação atual",
-                    "Definição de objetivos SMART",
-                    "Estruturação da equipe",
-                    "Setup de ferramentas e sistemas"
-                ],
-                "investimento_estimado": "R$ 10.000 - R$ 25.000",
-                "resultados_esperados": ["Base sólida estabelecida", "Processos definidos"]
-            },
-            "fase_2_lancamento": {
-                "duracao": "60 dias", 
-                "objetivos": ["Lançamento no mercado", "Primeiras vendas", "Ajustes iniciais"],
-                "atividades": [
-                    "Desenvolvimento de materiais de marketing",
-                    "Lançamento de campanhas digitais",
-                    "Início das operações comerciais",
-                    "Monitoramento e otimização"
-                ],
-                "investimento_estimado": "R$ 15.000 - R$ 40.000",
-                "resultados_esperados": ["Primeiras vendas realizadas", "Feedback do mercado"]
-            },
-            "fase_3_crescimento": {
-                "duracao": "90 dias",
-                "objetivos": ["Escalonamento", "Otimização", "Expansão"],
-                "atividades": [
-                    "Otimização de campanhas",
-                    "Expansão de canais",
-                    "Automação de processos",
-                    "Análise de resultados e ajustes"
-                ],
-                "investimento_estimado": "R$ 20.000 - R$ 60.000",
-                "resultados_esperados": ["Crescimento sustentável", "ROI positivo"]
-            }
-        }
+        return _thaw(_IMPLEMENTATION_PLAN)
     
     def _create_advanced_success_metrics(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria métricas de sucesso avançadas"""
-        return {
-            "kpis_financeiros": {
-                "receita_mensal": {"meta": "R$ 50.000", "atual": "R$ 0", "crescimento_esperado": "100%/mês"},
-                "margem_lucro": {"meta": "40%", "atual": "0%", "benchmark_setor": "25-35%"},
-                "roi_marketing": {"meta": "300%", "atual": "0%", "benchmark_setor": "200-400%"},
-                "ticket_medio": {"meta": "R$ 2.500", "atual": "R$ 0", "crescimento_esperado": "15%/trimestre"}
-            },
-            "kpis_operacionais": {
-                "taxa_conversao": {"meta": "5%", "atual": "0%", "benchmark_setor": "2-8%"},
-                "custo_aquisicao": {"meta": "R$ 500", "atual": "R$ 0", "benchmark_setor": "R$ 300-800"},
-                "lifetime_value": {"meta": "R$ 15.000", "atual": "R$ 0", "benchmark_setor": "R$ 8.000-20.000"},
-                "churn_rate": {"meta": "5%", "atual": "0%", "benchmark_setor": "10-15%"}
-            },
-            "kpis_marketing": {
-                "reach_mensal": {"meta": "100.000", "atual": "0", "crescimento_esperado": "50%/mês"},
-                "engagement_rate": {"meta": "8%", "atual": "0%", "benchmark_setor": "3-10%"},
-                "leads_qualificados": {"meta": "500/mês", "atual": "0", "crescimento_esperado": "100%/mês"},
-                "share_of_voice": {"meta": "15%", "atual": "0%", "benchmark_setor": "5-20%"}
-            }
-        }
+        return _thaw(_SUCCESS_METRICS)
     
     def _create_365_day_timeline(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria cronograma detalhado de 365 dias"""
-        return {
-            "trimestre_1": {
-                "foco": "Fundação e Estruturação",
-                "marcos": ["Setup completo", "Primeira venda", "Equipe formada"],
-                "investimento": "R$ 50.000",
-                "receita_esperada": "R$ 25.000"
-            },
-            "trimestre_2": {
-                "foco": "Crescimento e Otimização", 
-                "marcos": ["100 clientes", "ROI positivo", "Processos automatizados"],
-                "investimento": "R$ 75.000",
-                "receita_esperada": "R$ 150.000"
-            },
-            "trimestre_3": {
-                "foco": "Escalonamento e Expansão",
-                "marcos": ["500 clientes", "Novos produtos", "Expansão geográfica"],
-                "investimento": "R$ 100.000", 
-                "receita_esperada": "R$ 400.000"
-            },
-            "trimestre_4": {
-                "foco": "Consolidação e Inovação",
-                "marcos": ["1000 clientes", "Liderança de mercado", "Novos mercados"],
-                "investimento": "R$ 150.000",
-                "receita_esperada": "R$ 800.000"
-            }
-        }
+        return _thaw(_TIMELINE_365_DAYS)
     
     def _create_monitoring_system(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Cria sistema de monitoramento e otimização"""
-        return {
-            "dashboards": [
-                "Dashboard Financeiro (atualização diária)",
-                "Dashboard de Marketing (atualização em tempo real)",
-                "Dashboard Operacional (atualização semanal)",
-                "Dashboard Estratégico (atualização mensal)"
-            ],
-            "alertas": [
-                "ROI abaixo de 200% - Alerta crítico",
-                "Taxa de conversão abaixo de 3% - Alerta médio",
-                "Custo de aquisição acima de R$ 800 - Alerta alto",
-                "Churn rate acima de 10% - Alerta crítico"
-            ],
-            "relatorios": [
-                "Relatório semanal de performance",
-                "Relatório mensal de resultados",
-                "Relatório trimestral estratégico",
-                "Relatório anual de crescimento"
-            ],
-            "otimizacoes": [
-                "A/B testing contínuo em campanhas",
-                "Otimização de funil de vendas",
-                "Melhoria contínua de processos",
-                "Análise preditiva de tendências"
-            ]
-        }
+        return _thaw(_MONITORING_SYSTEM)
     
-    def _calculate_ultra_quality_score(self, analysis: Dict[str, Any]) -> float:
-        """Calcula score de qualidade ultra-detalhado"""
-        score = 0.0
-        max_score = 100.0
+    def _calculate_ultra_scores(self, analysis: Dict[str, Any]) -> Tuple[float, float]:
+        """Calcula os scores de qualidade e de completude em uma única verificação das seções"""
+        filled_sections = {section for section in _SCORED_SECTIONS if analysis.get(section)}
         
-        # Pontuação por seções implementadas (40 pontos)
-        required_sections = [
-            "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave",
-            "insights_exclusivos_ultra", "plano_implementacao_completo", "metricas_sucesso_avancadas"
-        ]
+        # QUALIDADE
+        quality_score = 0.0
         
-        for section in required_sections:
-            if section in analysis and analysis[section]:
-                score += 6.67  # 40/6 = 6.67 pontos por seção
+        # Pontuação por seções implementadas (40 pontos, 6.67 por seção)
+        quality_score += sum(6.67 for section in _QUALITY_SECTIONS if section in filled_sections)
         
         # Pontuação por profundidade de insights (30 pontos)
         insights = analysis.get("insights_exclusivos_ultra", [])
         if len(insights) >= 15:
-            score += 30.0
+            quality_score += 30.0
         elif len(insights) >= 10:
-            score += 20.0
+            quality_score += 20.0
         elif len(insights) >= 5:
-            score += 10.0
+            quality_score += 10.0
         
         # Pontuação por dados de pesquisa (30 pontos)
         if "pesquisa_web_detalhada" in analysis:
-            score += 15.0
+            quality_score += 15.0
         if "inteligencia_mercado_ultra" in analysis:
-            score += 15.0
-        
-        return min(score, max_score)
-    
-    def _calculate_completeness_score(self, analysis: Dict[str, Any]) -> float:
-        """Calcula score de completude da análise"""
-        total_sections = 10  # Total de seções principais
-        completed_sections = 0
-        
-        sections_to_check = [
-            "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave",
-            "insights_exclusivos_ultra", "plano_implementacao_completo", 
-            "metricas_sucesso_avancadas", "cronograma_365_dias", "sistema_monitoramento",
-            "inteligencia_mercado_ultra", "analise_concorrencia_ultra"
-        ]
+            quality_score += 15.0
         
-        for section in sections_to_check:
-            if section in analysis and analysis[section]:
-                completed_sections += 1
+        # COMPLETUDE
+        completed_sections = len(filled_sections.intersection(_COMPLETENESS_SECTIONS))
+        completeness_score = (completed_sections / len(_COMPLETENESS_SECTIONS)) * 100.0
         
-        return (completed_sections / len(sections_to_check)) * 100.0
+        return min(quality_score, 100.0), completeness_score
     
     def _generate_emergency_ultra_fallback(self, data: Dict[str, Any], error: str) -> Dict[str, Any]:
         """Gera análise de emergência ultra-básica"""
@@ -706,7 +1006,7 @@ class UltraRobustAnalyzer:
         basic_analysis["metadata_ultra_detalhado"] = {
             "processing_time_seconds": 0,
             "analysis_engine": "Emergency Fallback Ultra",
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "quality_score": 25.0,
             "completeness_score": 15.0,
             "error": error,
@@ -779,14 +1079,15 @@ def analyze_market():
                 # Não falha a análise por erro de banco
         
         logger.info("🎉 Análise ultra-robusta concluída com sucesso!")
-        return jsonify(result)
+        # Resultado é grande: serializa com orjson em vez do encoder padrão
+        return Response(orjson.dumps(result, default=str), mimetype='application/json')
         
     except Exception as e:
         logger.error(f"❌ Erro crítico na análise: {str(e)}", exc_info=True)
         return jsonify({
             'error': 'Erro interno na análise',
             'message': str(e),
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         }), 500
 
 @analysis_bp.route('/upload_attachment', methods=['POST'])
@@ -850,7 +1151,7 @@ def perform_deep_search():
             'query': query,
             'context': context,
             'result': result,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': datetime.now(timezone.utc).isoformat()
         })
         
     except Exception as e:
@@ -873,7 +1174,8 @@ def list_analyses():
         
         # Filtra por segmento se especificado
         if segmento:
-            analyses = [a for a in analyses if segmento.lower() in a.get('nicho', '').lower()]
+            segmento_lower = segmento.lower()
+            analyses = [a for a in analyses if segmento_lower in (a.get('nicho') or '').lower()]
         
         return jsonify({
             'analyses': analyses,
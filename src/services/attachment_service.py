@@ -6,6 +6,7 @@ Análise inteligente de documentos e arquivos
 """
 
 import os
+import re
 import logging
 import mimetypes
 from typing import Dict, List, Optional, Any, Tuple
@@ -13,11 +14,19 @@ from werkzeug.datastructures import FileStorage
 import PyPDF2
 import pandas as pd
 from docx import Document
-import json
+import orjson
 from datetime import datetime
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
+# Características de persona buscadas nos perfis psicológicos
+_PERSONA_KEYWORDS = ('idade', 'gênero', 'renda', 'comportamento', 'interesse')
+
+# Números/percentuais e estatísticas (apenas percentuais) citados no conteúdo
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?%?')
+_PERCENT_RE = re.compile(r'\d+(?:\.\d+)?%')
+
 class AttachmentService:
     """Serviço para processamento inteligente de anexos"""
     
@@ -260,9 +269,10 @@ class AttachmentService:
     def _extract_json_content(self, file_path: str) -> Optional[str]:
         """Extrai conteúdo de arquivo JSON"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                return json.dumps(data, indent=2, ensure_ascii=False)
+            with open(file_path, 'rb') as file:
+                data = orjson.loads(file.read())
+            # orjson já emite UTF-8 sem escapar acentos (equivale a ensure_ascii=False)
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
                 
         except Exception as e:
             logger.error(f"Erro ao extrair JSON: {str(e)}")
@@ -273,12 +283,9 @@ class AttachmentService:
         content_lower = content.lower()
         scores = {}
         
-        # Calcula score para cada categoria
+        # Calcula score para cada categoria (palavras-chave já estão em minúsculas)
         for category, keywords in self.content_classifiers.items():
-            score = 0
-            for keyword in keywords:
-                score += content_lower.count(keyword.lower())
-            scores[category] = score
+            scores[category] = sum(map(content_lower.count, keywords))
         
         # Retorna categoria com maior score
         if scores:
@@ -306,10 +313,11 @@ class AttachmentService:
         """Processa conteúdo relacionado a gatilhos mentais"""
         processed = "DRIVERS MENTAIS IDENTIFICADOS:\n\n"
         
-        drivers_found = []
-        for driver in self.content_classifiers['drivers_mentais']:
-            if driver.lower() in content.lower():
-                drivers_found.append(driver)
+        content_lower = content.lower()
+        drivers_found = [
+            driver for driver in self.content_classifiers['drivers_mentais']
+            if driver in content_lower
+        ]
         
         if drivers_found:
             processed += f"Gatilhos encontrados: {', '.join(drivers_found)}\n\n"
@@ -323,11 +331,10 @@ class AttachmentService:
         """Processa provas visuais e depoimentos"""
         processed = "PROVAS VISUAIS E DEPOIMENTOS:\n\n"
         
-        # Identifica números e percentuais
-        import re
-        numbers = re.findall(r'\d+(?:\.\d+)?%?', content)
+        # Identifica números e percentuais (para de varrer após os 10 primeiros)
+        numbers = [m.group() for m in islice(_NUMBER_RE.finditer(content), 10)]
         if numbers:
-            processed += f"Números identificados: {', '.join(numbers[:10])}\n\n"
+            processed += f"Números identificados: {', '.join(numbers)}\n\n"
         
         processed += "CONTEÚDO ORIGINAL:\n"
         processed += content
@@ -338,13 +345,12 @@ class AttachmentService:
         """Processa perfis psicológicos e personas"""
         processed = "PERFIS PSICOLÓGICOS IDENTIFICADOS:\n\n"
         
-        # Busca por características de persona
-        characteristics = []
-        persona_keywords = ['idade', 'gênero', 'renda', 'comportamento', 'interesse']
-        
-        for keyword in persona_keywords:
-            if keyword in content.lower():
-                characteristics.append(keyword)
+        # Busca por características de persona (minúsculas calculadas uma única vez)
+        content_lower = content.lower()
+        characteristics = [
+            keyword for keyword in _PERSONA_KEYWORDS
+            if keyword in content_lower
+        ]
         
         if characteristics:
             processed += f"Características encontradas: {', '.join(characteristics)}\n\n"
@@ -358,11 +364,10 @@ class AttachmentService:
         """Processa dados de pesquisa e estatísticas"""
         processed = "DADOS DE PESQUISA ANALISADOS:\n\n"
         
-        # Identifica dados estatísticos
-        import re
-        stats = re.findall(r'\d+(?:\.\d+)?%', content)
+        # Identifica dados estatísticos (para de varrer após os 10 primeiros)
+        stats = [m.group() for m in islice(_PERCENT_RE.finditer(content), 10)]
         if stats:
-            processed += f"Estatísticas encontradas: {', '.join(stats[:10])}\n\n"
+            processed += f"Estatísticas encontradas: {', '.join(stats)}\n\n"
         
         processed += "CONTEÚDO ORIGINAL:\n"
         processed += content
@@ -6,16 +6,44 @@ Pesquisa avançada na internet com múltiplas fontes
 """
 
 import os
+import atexit
 import logging
 import time
 import requests
 from typing import Dict, List, Optional, Any
-from urllib.parse import quote_plus
-import json
+from urllib.parse import quote_plus, urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 from datetime import datetime
+from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
 
+def _is_http_url(url: str) -> bool:
+    """URL http(s) com host, válida para extração (descarta javascript:, mailto:, data: etc.)"""
+    parsed = urlparse(url)
+    return parsed.scheme.lower() in ('http', 'https') and bool(parsed.netloc)
+
+def _resolve_ddg_href(href: str) -> str:
+    """Converte o link de resultado do DuckDuckGo (//duckduckgo.com/l/?uddg=...) na URL de destino"""
+    target = parse_qs(urlparse(href).query).get('uddg')
+    if target:
+        return target[0]
+    # Links relativos ao protocolo ("//site.com/...") viram https
+    return f"https:{href}" if href.startswith('//') else href
+
+# Instruções fixas enviadas ao DeepSeek em toda busca profunda
+_DEEPSEEK_INSTRUCTIONS = """
+Forneça um resumo estruturado com:
+1. Principais tendências identificadas
+2. Dados de mercado relevantes
+3. Oportunidades identificadas
+4. Insights para estratégia de marketing
+5. Informações sobre concorrência
+
+Seja conciso e focado nos dados mais relevantes.
+"""
+
 class DeepSearchService:
     """Serviço de busca profunda na internet"""
     
@@ -34,8 +62,18 @@ class DeepSearchService:
         self.headers = {
             'User-Agent': 'ARQV30-Enhanced/2.0 (Market Research Bot)',
             'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate, br',
             'Content-Type': 'application/json'
         }
+        
+        # Pool reutilizado para extrair páginas em paralelo (trabalho limitado por rede)
+        self.max_workers = int(os.getenv('DEEP_SEARCH_MAX_WORKERS', 8))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="arq-deep-search")
+        atexit.register(self.close)
+    
+    def close(self) -> None:
+        """Encerra o pool de threads compartilhado"""
+        self._executor.shutdown(wait=False)
     
     def perform_deep_search(
         self, 
@@ -61,15 +99,26 @@ class DeepSearchService:
             ddg_results = self._duckduckgo_search(query, max_results // 2)
             search_results.extend(ddg_results)
             
-            # 3. Extrai conteúdo das páginas encontradas
+            # Remove URLs repetidas entre as fontes antes de extrair
+            seen_urls = set()
+            unique_results = []
+            for result in search_results:
+                url = result.get('url', '')
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    unique_results.append(result)
+            
+            # 3. Extrai conteúdo das páginas encontradas em paralelo
+            pages = unique_results[:5]  # Limita a 5 páginas
+            contents = self._extract_pages_concurrently(pages, max_len=2000)
+            
             content_results = []
-            for result in search_results[:5]:  # Limita a 5 páginas
-                content = self._extract_page_content(result.get('url', ''))
+            for result, content in zip(pages, contents):
                 if content:
                     content_results.append({
                         'title': result.get('title', ''),
-                        'url': result.get('url', ''),
-                        'content': content[:2000]  # Limita conteúdo
+                        'url': result['url'],
+                        'content': content
                     })
             
             # 4. Processa com DeepSeek (se disponível)
@@ -112,7 +161,7 @@ class DeepSearchService:
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 results = []
                 
                 for item in data.get('items', []):
@@ -136,7 +185,10 @@ class DeepSearchService:
     def _duckduckgo_search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Busca usando DuckDuckGo (método alternativo)"""
         try:
-            # Simula busca DuckDuckGo via scraping básico
+            if max_results <= 0:
+                return []
+            
+            # Busca DuckDuckGo via scraping básico do HTML
             search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
             
             response = requests.get(
@@ -148,10 +200,34 @@ class DeepSearchService:
             )
             
             if response.status_code == 200:
-                # Parse básico do HTML (implementação simplificada)
+                soup = BeautifulSoup(response.content, 'lxml')
                 results = []
                 
-                # Para demonstração, retorna resultados simulados
+                # Extrai resultados reais do HTML retornado
+                for div in soup.find_all('div', class_='result'):
+                    title_elem = div.find('a', class_='result__a')
+                    if not title_elem:
+                        continue
+                    
+                    title = title_elem.get_text(strip=True)
+                    url = _resolve_ddg_href(title_elem.get('href', ''))
+                    snippet_elem = div.find('a', class_='result__snippet')
+                    
+                    if url and title:
+                        results.append({
+                            'title': title,
+                            'url': url,
+                            'snippet': snippet_elem.get_text(strip=True) if snippet_elem else '',
+                            'source': 'duckduckgo'
+                        })
+                        if len(results) >= max_results:
+                            break
+                
+                if results:
+                    logger.info(f"DuckDuckGo Search: {len(results)} resultados")
+                    return results
+                
+                # Sem resultados no HTML, retorna resultados simulados
                 sample_results = [
                     {
                         'title': f'Resultado sobre {query} - Fonte 1',
@@ -176,23 +252,33 @@ class DeepSearchService:
             logger.error(f"Erro no DuckDuckGo Search: {str(e)}")
             return []
     
-    def _extract_page_content(self, url: str) -> Optional[str]:
-        """Extrai conteúdo de uma página web"""
+    def _extract_pages_concurrently(
+        self, 
+        pages: List[Dict[str, Any]], 
+        max_len: int
+    ) -> List[Optional[str]]:
+        """Extrai conteúdo de várias páginas ao mesmo tempo, mantendo a ordem"""
+        return list(self._executor.map(
+            lambda page: self._extract_page_content(page['url'], max_len), pages
+        ))
+    
+    def _extract_page_content(self, url: str, max_len: int = 3000) -> Optional[str]:
+        """Extrai conteúdo de uma página web (até max_len caracteres)"""
         try:
-            if not url or not url.startswith('http'):
+            if not url or not _is_http_url(url):
                 return None
             
             # Usa Jina Reader se disponível
             if self.jina_api_key:
-                return self._extract_with_jina(url)
+                return self._extract_with_jina(url, max_len)
             else:
-                return self._extract_basic(url)
+                return self._extract_basic(url, max_len)
                 
         except Exception as e:
             logger.error(f"Erro ao extrair conteúdo de {url}: {str(e)}")
             return None
     
-    def _extract_with_jina(self, url: str) -> Optional[str]:
+    def _extract_with_jina(self, url: str, max_len: int = 3000) -> Optional[str]:
         """Extrai conteúdo usando Jina Reader"""
         try:
             headers = {
@@ -207,7 +293,7 @@ class DeepSearchService:
             )
             
             if response.status_code == 200:
-                return response.text[:3000]  # Limita tamanho
+                return response.text[:max_len]  # Limita tamanho
             
             return None
             
@@ -215,7 +301,7 @@ class DeepSearchService:
             logger.error(f"Erro no Jina Reader: {str(e)}")
             return None
     
-    def _extract_basic(self, url: str) -> Optional[str]:
+    def _extract_basic(self, url: str, max_len: int = 3000) -> Optional[str]:
         """Extração básica de conteúdo"""
         try:
             response = requests.get(
@@ -226,8 +312,7 @@ class DeepSearchService:
             
             if response.status_code == 200:
                 # Parse básico do HTML
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(response.content, 'lxml')
                 
                 # Remove scripts e styles
                 for script in soup(["script", "style"]):
@@ -236,12 +321,19 @@ class DeepSearchService:
                 # Extrai texto
                 text = soup.get_text()
                 
-                # Limpa e limita
+                # Limpa e limita, parando assim que atingir max_len
                 lines = (line.strip() for line in text.splitlines())
                 chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = ' '.join(chunk for chunk in chunks if chunk)
+                parts = []
+                length = 0
+                for chunk in chunks:
+                    if chunk:
+                        parts.append(chunk)
+                        length += len(chunk) + 1
+                        if length >= max_len:
+                            break
                 
-                return text[:3000]  # Limita a 3000 caracteres
+                return ' '.join(parts)[:max_len]
             
             return None
             
@@ -269,24 +361,17 @@ CONTEXTO DO PROJETO:
 RESULTADOS DA PESQUISA:
 """
             
-            for i, result in enumerate(content_results, 1):
-                prompt += f"\n{i}. {result['title']}\n{result['content']}\n"
-            
-            prompt += """
-Forneça um resumo estruturado com:
-1. Principais tendências identificadas
-2. Dados de mercado relevantes
-3. Oportunidades identificadas
-4. Insights para estratégia de marketing
-5. Informações sobre concorrência
-
-Seja conciso e focado nos dados mais relevantes.
-"""
+            results_block = "".join(
+                f"\n{i}. {result['title']}\n{result['content']}\n"
+                for i, result in enumerate(content_results, 1)
+            )
+            prompt += results_block
             
-            # Chama DeepSeek API
+            # Chama DeepSeek API (instruções fixas como system prompt)
             payload = {
                 "model": "deepseek-chat",
                 "messages": [
+                    {"role": "system", "content": _DEEPSEEK_INSTRUCTIONS},
                     {"role": "user", "content": prompt}
                 ],
                 "temperature": 0.7,
@@ -300,13 +385,13 @@ Seja conciso e focado nos dados mais relevantes.
             
             response = requests.post(
                 self.deepseek_url,
-                json=payload,
+                data=orjson.dumps(payload),
                 headers=headers,
                 timeout=30
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 return data['choices'][0]['message']['content']
             else:
                 logger.warning(f"DeepSeek API falhou: {response.status_code}")
@@ -321,15 +406,15 @@ Seja conciso e focado nos dados mais relevantes.
         if not content_results:
             return "Nenhum resultado de pesquisa encontrado."
         
-        summary = "RESUMO DA PESQUISA:\n\n"
+        parts = ["RESUMO DA PESQUISA:\n\n"]
         
         for i, result in enumerate(content_results, 1):
-            summary += f"{i}. {result['title']}\n"
-            summary += f"   {result['content'][:200]}...\n\n"
+            parts.append(f"{i}. {result['title']}\n")
+            parts.append(f"   {result['content'][:200]}...\n\n")
         
-        summary += f"\nTotal de {len(content_results)} fontes analisadas."
+        parts.append(f"\nTotal de {len(content_results)} fontes analisadas.")
         
-        return summary
+        return "".join(parts)
     
     def _generate_fallback_search(self, query: str, context: Dict[str, Any]) -> str:
         """Gera resultado de busca básico em caso de erro"""
@@ -8,29 +8,47 @@ Motor de análise avançado com múltiplas IAs e sistemas integrados
 import os
 import logging
 import time
-import json
-from datetime import datetime
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
-from services.gemini_client import gemini_client
+from services.gemini_client import UltraRobustGeminiClient, get_gemini_client
 from services.websailor_integration import websailor_agent
 from services.deep_search_service import deep_search_service
 
 logger = logging.getLogger(__name__)
 
+# Seções principais pontuadas no score de qualidade (15 pontos cada)
+_MAIN_SECTIONS = frozenset({
+    "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave", "insights_exclusivos"
+})
+
 class EnhancedAnalysisEngine:
     """Motor de análise avançado com integração de múltiplos sistemas"""
     
+    # Atributos fixos da instância global (sem __dict__ por instância)
+    __slots__ = ("max_analysis_time", "systems_enabled", "_executor")
+    
     def __init__(self):
         """Inicializa o motor de análise"""
         self.max_analysis_time = 1800  # 30 minutos
         self.systems_enabled = {
-            'gemini': bool(gemini_client),
+            'gemini': bool(os.getenv('GEMINI_API_KEY')),
             'websailor': websailor_agent.is_available(),
             'deep_search': bool(deep_search_service)
         }
         
+        # Pool reutilizado para as pesquisas independentes (WebSailor e Deep Search)
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="arq-engine")
+        atexit.register(self.close)
+        
         logger.info(f"Enhanced Analysis Engine inicializado - Sistemas: {self.systems_enabled}")
     
+    def close(self) -> None:
+        """Encerra o pool de threads compartilhado"""
+        self._executor.shutdown(wait=False)
+    
     def generate_comprehensive_analysis(
         self, 
         data: Dict[str, Any],
@@ -38,7 +56,7 @@ class EnhancedAnalysisEngine:
     ) -> Dict[str, Any]:
         """Gera análise abrangente usando todos os sistemas disponíveis"""
         
-        start_time = time.time()
+        start_time = time.monotonic()
         logger.info(f"🚀 Iniciando análise abrangente para {data.get('segmento')}")
         
         try:
@@ -48,25 +66,26 @@ class EnhancedAnalysisEngine:
             
             # FASE 2: Análise com IA
             logger.info("🧠 FASE 2: Análise com IA...")
-            ai_analysis = self._perform_ai_analysis(data, research_data)
+            gemini_client = get_gemini_client() if self.systems_enabled['gemini'] else None
+            ai_analysis = self._perform_ai_analysis(data, research_data, gemini_client)
             
             # FASE 3: Consolidação final
             logger.info("🎯 FASE 3: Consolidação final...")
             final_analysis = self._consolidate_analysis(data, research_data, ai_analysis)
             
-            end_time = time.time()
-            processing_time = end_time - start_time
+            processing_time = time.monotonic() - start_time
             
-            # Adiciona metadados
+            # Adiciona metadados (Gemini conta só se o cliente existiu nesta execução)
+            systems_used = {**self.systems_enabled, 'gemini': gemini_client is not None}
             final_analysis["metadata"] = {
                 "processing_time_seconds": processing_time,
                 "processing_time_formatted": f"{int(processing_time // 60)}m {int(processing_time % 60)}s",
                 "analysis_engine": "ARQV30 Enhanced v2.0",
-                "systems_used": [k for k, v in self.systems_enabled.items() if v],
-                "generated_at": datetime.utcnow().isoformat(),
+                "systems_used": [k for k, v in systems_used.items() if v],
+                "generated_at": datetime.now(timezone.utc).isoformat(),
                 "quality_score": self._calculate_quality_score(final_analysis),
                 "data_sources_used": len(research_data.get("sources", [])),
-                "ai_models_used": 1 if self.systems_enabled['gemini'] else 0
+                "ai_models_used": 1 if gemini_client is not None else 0
             }
             
             logger.info(f"✅ Análise abrangente concluída em {processing_time:.2f} segundos")
@@ -90,74 +109,98 @@ class EnhancedAnalysisEngine:
             "total_content_length": 0
         }
         
-        # 1. Pesquisa web com WebSailor
+        # WebSailor e Deep Search são chamadas de rede independentes: executa em paralelo
+        web_future = None
         if self.systems_enabled['websailor'] and data.get('query'):
-            logger.info("🌐 Executando pesquisa web com WebSailor...")
-            try:
-                web_result = websailor_agent.navigate_and_research(
-                    data['query'],
-                    context={
-                        "segmento": data.get('segmento'),
-                        "produto": data.get('produto'),
-                        "publico": data.get('publico')
-                    },
-                    max_pages=8,
-                    depth=2,
-                    aggressive_mode=True
-                )
-                research_data["web_research"] = web_result
-                research_data["sources"].extend(web_result.get("sources", []))
-                
-                # Adiciona conteúdo combinado
-                combined_content = web_result.get("research_summary", {}).get("combined_content", "")
-                research_data["total_content_length"] += len(combined_content)
-                
-                logger.info(f"✅ WebSailor: {len(web_result.get('sources', []))} fontes analisadas")
-            except Exception as e:
-                logger.error(f"Erro no WebSailor: {str(e)}")
+            web_future = self._executor.submit(self._run_websailor_research, data)
         
-        # 2. Deep Search
+        deep_future = None
         if self.systems_enabled['deep_search'] and data.get('query'):
-            logger.info("🔬 Executando deep search...")
-            try:
-                deep_result = deep_search_service.perform_deep_search(
-                    data['query'],
-                    data,
-                    max_results=15
-                )
-                research_data["deep_search"] = deep_result
-                research_data["total_content_length"] += len(str(deep_result))
-                
-                logger.info("✅ Deep search concluído")
-            except Exception as e:
-                logger.error(f"Erro no Deep Search: {str(e)}")
+            deep_future = self._executor.submit(self._run_deep_search, data)
+        
+        # 1. Pesquisa web com WebSailor
+        web_result = web_future.result() if web_future else None
+        if web_result:
+            research_data["web_research"] = web_result
+            research_data["sources"].extend(web_result.get("sources", []))
+            
+            # Adiciona conteúdo combinado
+            combined_content = web_result.get("research_summary", {}).get("combined_content", "")
+            research_data["total_content_length"] += len(combined_content)
+        
+        # 2. Deep Search
+        deep_result = deep_future.result() if deep_future else None
+        if deep_result:
+            research_data["deep_search"] = deep_result
+            # perform_deep_search retorna texto; conta direto sem converter
+            if isinstance(deep_result, str):
+                research_data["total_content_length"] += len(deep_result)
         
         return research_data
     
+    def _run_websailor_research(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Executa pesquisa web com WebSailor"""
+        logger.info("🌐 Executando pesquisa web com WebSailor...")
+        try:
+            web_result = websailor_agent.navigate_and_research(
+                data['query'],
+                context={
+                    "segmento": data.get('segmento'),
+                    "produto": data.get('produto'),
+                    "publico": data.get('publico')
+                },
+                max_pages=8,
+                depth=2,
+                aggressive_mode=True
+            )
+            logger.info(f"✅ WebSailor: {len(web_result.get('sources', []))} fontes analisadas")
+            return web_result
+        except Exception as e:
+            logger.error(f"Erro no WebSailor: {str(e)}")
+            return None
+    
+    def _run_deep_search(self, data: Dict[str, Any]) -> Optional[str]:
+        """Executa deep search"""
+        logger.info("🔬 Executando deep search...")
+        try:
+            deep_result = deep_search_service.perform_deep_search(
+                data['query'],
+                data,
+                max_results=15
+            )
+            logger.info("✅ Deep search concluído")
+            return deep_result
+        except Exception as e:
+            logger.error(f"Erro no Deep Search: {str(e)}")
+            return None
+    
     def _perform_ai_analysis(
         self, 
         data: Dict[str, Any], 
-        research_data: Dict[str, Any]
+        research_data: Dict[str, Any],
+        gemini_client: Optional[UltraRobustGeminiClient]
     ) -> Dict[str, Any]:
         """Executa análise com IA usando Gemini"""
         
-        if not self.systems_enabled['gemini']:
+        if not gemini_client:
             logger.warning("Gemini não disponível - usando análise básica")
             return self._generate_basic_analysis(data)
         
         try:
-            # Prepara contexto de pesquisa
-            search_context = ""
+            # Prepara contexto de pesquisa (partes unidas uma única vez)
+            context_parts = []
             if research_data.get("web_research"):
                 web_summary = research_data["web_research"].get("research_summary", {})
-                search_context += f"PESQUISA WEB:\n{web_summary.get('combined_content', '')}\n\n"
+                context_parts.append(f"PESQUISA WEB:\n{web_summary.get('combined_content', '')}\n\n")
                 
                 insights = web_summary.get("key_insights", [])
                 if insights:
-                    search_context += f"INSIGHTS WEB:\n" + "\n".join(insights) + "\n\n"
+                    context_parts.append("INSIGHTS WEB:\n" + "\n".join(insights) + "\n\n")
             
             if research_data.get("deep_search"):
-                search_context += f"DEEP SEARCH:\n{research_data['deep_search']}\n\n"
+                context_parts.append(f"DEEP SEARCH:\n{research_data['deep_search']}\n\n")
+            
+            search_context = "".join(context_parts)
             
             # Executa análise com Gemini
             logger.info("🤖 Executando análise com Gemini Pro...")
@@ -180,10 +223,10 @@ class EnhancedAnalysisEngine:
         research_data: Dict[str, Any], 
         ai_analysis: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Consolida toda a análise"""
+        """Consolida toda a análise (enriquece ai_analysis no próprio dict)"""
         
-        # Usa análise da IA como base
-        consolidated = ai_analysis.copy()
+        # Usa análise da IA como base; é gerada por chamada, então não precisa de cópia
+        consolidated = ai_analysis
         
         # Enriquece com dados de pesquisa
         if research_data.get("web_research"):
@@ -195,8 +238,8 @@ class EnhancedAnalysisEngine:
         # Adiciona insights exclusivos baseados na pesquisa
         exclusive_insights = self._generate_exclusive_insights(data, research_data, ai_analysis)
         if exclusive_insights:
-            existing_insights = consolidated.get("insights_exclusivos", [])
-            consolidated["insights_exclusivos"] = existing_insights + exclusive_insights
+            # Estende a lista existente no lugar (sem criar uma nova lista concatenada)
+            consolidated.setdefault("insights_exclusivos", []).extend(exclusive_insights)
         
         return consolidated
     
@@ -213,8 +256,7 @@ class EnhancedAnalysisEngine:
         # Insights baseados na pesquisa web
         if research_data.get("web_research"):
             web_insights = research_data["web_research"].get("research_summary", {}).get("key_insights", [])
-            for insight in web_insights[:3]:
-                insights.append(f"🌐 Pesquisa Web: {insight}")
+            insights.extend(f"🌐 Pesquisa Web: {insight}" for insight in islice(web_insights, 3))
         
         # Insights baseados no deep search
         if research_data.get("deep_search"):
@@ -273,17 +315,11 @@ class EnhancedAnalysisEngine:
     def _calculate_quality_score(self, analysis: Dict[str, Any]) -> float:
         """Calcula score de qualidade da análise"""
         
-        score = 0.0
         max_score = 100.0
         
-        # Pontuação por seções principais (60 pontos)
-        main_sections = [
-            "avatar_ultra_detalhado", "escopo", "estrategia_palavras_chave", "insights_exclusivos"
-        ]
-        
-        for section in main_sections:
-            if section in analysis and analysis[section]:
-                score += 15.0  # 60/4 = 15 pontos por seção
+        # Pontuação por seções principais (60 pontos, 15 por seção)
+        # Contagem feita inteiramente em builtins de C (map/bool/sum), sem laço Python
+        score = 15.0 * sum(map(bool, map(analysis.get, _MAIN_SECTIONS)))
         
         # Pontuação por pesquisa (20 pontos)
         if "pesquisa_web_detalhada" in analysis:
@@ -314,7 +350,7 @@ class EnhancedAnalysisEngine:
         basic_analysis["metadata"] = {
             "processing_time_seconds": 0,
             "analysis_engine": "Emergency Fallback",
-            "generated_at": datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "quality_score": 25.0,
             "error": error,
             "recommendation": "Execute nova análise com configuração completa"
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ARQV30 Enhanced v2.0 - File Cache
+Cache em disco compartilhado pelos serviços (um arquivo JSON por chave)
+"""
+
+import os
+import time
+import logging
+import tempfile
+import threading
+import orjson
+from typing import Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Quantidade de gravações entre duas varreduras de limpeza do diretório
+_PRUNE_EVERY = 32
+
+# Raiz dos caches em disco (por padrão fora da árvore do código-fonte)
+CACHE_ROOT = os.getenv('ARQ_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'arqv30-cache'))
+
+def cache_directory(*parts: str) -> str:
+    """Caminho de um cache dentro da raiz configurada em ARQ_CACHE_DIR"""
+    return os.path.join(CACHE_ROOT, *parts)
+
+class FileCache:
+    """Cache em disco com TTL por mtime, escrita atômica e limite de entradas"""
+
+    def __init__(self, directory: str, ttl: int, max_entries: int = 1000):
+        """Inicializa o cache no diretório informado"""
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._writes = 0
+        self._prune_lock = threading.Lock()
+        
+        # Um cache nunca pode impedir a aplicação de subir: sem diretório, o disco fica desativado
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.enabled = True
+        except OSError as e:
+            logger.warning(f"Cache em disco desativado ({self.directory}): {str(e)}")
+            self.enabled = False
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, bytes]]:
+        """Retorna (idade em segundos, conteúdo bruto), ou None se ausente/expirada"""
+        if not self.enabled:
+            return None
+        cache_path = self._path(key)
+        try:
+            age = time.time() - os.path.getmtime(cache_path)
+            if age > self.ttl:
+                return None
+            with open(cache_path, 'rb') as cache_file:
+                return age, cache_file.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Erro ao ler cache em disco ({self.directory}): {str(e)}")
+            return None
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Retorna o conteúdo bruto da entrada, ou None se ausente/expirada"""
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Retorna a entrada desserializada, ou None se ausente/expirada"""
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"Entrada corrompida no cache em disco ({self.directory}): {str(e)}")
+            self._remove(self._path(key))
+            return None
+
+    def set_bytes(self, key: str, data: bytes) -> None:
+        """Grava a entrada com arquivo temporário exclusivo + os.replace"""
+        if not self.enabled:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as cache_file:
+                    cache_file.write(data)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                self._remove(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"Erro ao gravar cache em disco ({self.directory}): {str(e)}")
+            return
+
+        with self._prune_lock:
+            self._writes += 1
+            should_prune = self._writes % _PRUNE_EVERY == 1
+        if should_prune:
+            self.prune()
+
+    def set(self, key: str, value: Any) -> None:
+        """Serializa e grava a entrada"""
+        if not self.enabled:
+            return
+        try:
+            data = orjson.dumps(value, default=str)
+        except Exception as e:
+            logger.warning(f"Erro ao serializar entrada de cache ({self.directory}): {str(e)}")
+            return
+        self.set_bytes(key, data)
+
+    def prune(self) -> None:
+        """Remove entradas expiradas e as mais antigas acima do limite"""
+        if not self.enabled:
+            return
+        now = time.time()
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+                    if now - mtime > self.ttl:
+                        self._remove(entry.path)
+                    elif entry.name.endswith(".json"):
+                        entries.append((mtime, entry.path))
+        except Exception as e:
+            logger.warning(f"Erro ao limpar cache em disco ({self.directory}): {str(e)}")
+            return
+
+        excess = len(entries) - self.max_entries
+        if excess > 0:
+            entries.sort()
+            for _, path in entries[:excess]:
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
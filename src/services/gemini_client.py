@@ -6,148 +6,45 @@ Integração com IA Avançada para Análise de Mercado
 """
 
 import os
+import re
 import logging
-import json
 import time
+import random
+import hashlib
+import threading
+import unicodedata
+import orjson
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any
 import google.generativeai as genai
-from datetime import datetime
+from google.generativeai.types import GenerationConfig, HarmCategory, HarmBlockThreshold
+from google.api_core import exceptions as google_exceptions
+from services.file_cache import FileCache, cache_directory
+from datetime import datetime, timezone
 
 logger = logging.getLogger(__name__)
 
-class UltraRobustGeminiClient:
-    """Cliente para integração com Google Gemini Pro"""
-    
-    def __init__(self):
-        """Inicializa cliente Gemini"""
-        self.api_key = os.getenv('GEMINI_API_KEY')
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY não configurada")
-        
-        # Configura API
-        genai.configure(api_key=self.api_key)
-        
-        # Modelo principal (usando o mais avançado disponível)
-        self.model = genai.GenerativeModel("gemini-1.5-flash")
-        
-        # Configurações de geração
-        self.generation_config = {
-            'temperature': 0.7,
-            'top_p': 0.8,
-            'top_k': 40,
-            'max_output_tokens': 32768,  # Aumentado para análises ultra-detalhadas
-        }
-        
-        # Configurações de segurança
-        self.safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            }
-        ]
-    
-    def test_connection(self) -> bool:
-        """Testa conexão com Gemini"""
-        try:
-            response = self.model.generate_content(
-                "Teste de conexão. Responda apenas: OK",
-                generation_config=self.generation_config,
-                safety_settings=self.safety_settings
-            )
-            return "OK" in response.text
-        except Exception as e:
-            logger.error(f"Erro ao testar Gemini: {str(e)}")
-            return False
-    
-    def generate_ultra_detailed_analysis(
-        self, 
-        analysis_data: Dict[str, Any],
-        search_context: Optional[str] = None,
-        attachments_context: Optional[str] = None
-    ) -> Dict[str, Any]:
-        """Gera análise ultra-detalhada usando Gemini Pro"""
-        
-        try:
-            # Constrói prompt ultra-detalhado
-            prompt = self._build_analysis_prompt(analysis_data, search_context, attachments_context)
-            
-            logger.info("Iniciando análise com Gemini Pro...")
-            start_time = time.time()
-            
-            # Gera análise
-            response = self.model.generate_content(
-                prompt,
-                generation_config=self.generation_config,
-                safety_settings=self.safety_settings
-            )
-            
-            end_time = time.time()
-            logger.info(f"Análise concluída em {end_time - start_time:.2f} segundos")
-            
-            # Processa resposta
-            if response.text:
-                return self._parse_analysis_response(response.text)
-            else:
-                raise Exception("Resposta vazia do Gemini")
-                
-        except Exception as e:
-            logger.error(f"Erro na análise Gemini: {str(e)}")
-            return self._generate_fallback_analysis(analysis_data)
-    
-    def _build_analysis_prompt(
-        self, 
-        data: Dict[str, Any], 
-        search_context: Optional[str] = None,
-        attachments_context: Optional[str] = None
-    ) -> str:
-        """Constrói prompt detalhado para análise"""
-        
-        prompt = f"""
-# ANÁLISE ULTRA-DETALHADA DE MERCADO - ARQV30 ENHANCED
+# Carimbo de data/hora em UTC, formatado no máximo uma vez por segundo
+_TIMESTAMP_CACHE = [0, ""]
 
-Você é o DIRETOR SUPREMO DE ANÁLISE DE MERCADO, um especialista de elite com 25+ anos de experiência em análise de mercado, psicologia do consumidor, estratégia de negócios e marketing digital avançado.
-
-Sua missão é gerar a ANÁLISE MAIS COMPLETA E PROFUNDA possível, implementando TODOS os sistemas avançados dos documentos fornecidos:
-
-1. SISTEMA DE PROVAS VISUAIS INSTANTÂNEAS
-2. ARQUITETO DE DRIVERS MENTAIS  
-3. PRÉ-PITCH INVISÍVEL
-4. ENGENHARIA ANTI-OBJEÇÃO
-5. ANCORAGEM PSICOLÓGICA
+def _iso_now() -> str:
+    """Retorna o instante atual (UTC, precisão de segundos) em ISO 8601"""
+    now = int(time.time())
+    if now != _TIMESTAMP_CACHE[0]:
+        _TIMESTAMP_CACHE[1] = datetime.fromtimestamp(now, timezone.utc).isoformat()
+        _TIMESTAMP_CACHE[0] = now
+    return _TIMESTAMP_CACHE[1]
 
-IMPORTANTE: Esta análise deve ter PROFUNDIDADE EXTREMA, com insights únicos que vão muito além do óbvio. Seja ULTRA-ESPECÍFICO e ACIONÁVEL.
+# Bloco de código markdown em volta do JSON (da primeira à última cerca)
+_FENCE_RE = re.compile(r"```(?:json)?(.*)```", re.DOTALL)
 
-## DADOS DO PROJETO:
-- **Segmento**: {data.get('segmento', 'Não informado')}
-- **Produto/Serviço**: {data.get('produto', 'Não informado')}
-- **Público-Alvo**: {data.get('publico', 'Não informado')}
-- **Preço**: R$ {data.get('preco', 'Não informado')}
-- **Concorrentes**: {data.get('concorrentes', 'Não informado')}
-- **Objetivo de Receita**: R$ {data.get('objetivo_receita', 'Não informado')}
-- **Orçamento Marketing**: R$ {data.get('orcamento_marketing', 'Não informado')}
-- **Prazo de Lançamento**: {data.get('prazo_lancamento', 'Não informado')}
-- **Dados Adicionais**: {data.get('dados_adicionais', 'Não informado')}
-"""
+def _normalize_key_text(text: str) -> str:
+    """Normaliza texto livre para a chave de cache (minúsculas, sem acentos e espaços extras)"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(ascii_text.lower().split())
 
-        if search_context:
-            prompt += f"\n## CONTEXTO DE PESQUISA:\n{search_context}\n"
-        
-        if attachments_context:
-            prompt += f"\n## CONTEXTO DOS ANEXOS:\n{attachments_context}\n"
-        
-        prompt += """
+# Instruções e estrutura JSON esperada da análise: texto fixo, montado uma única vez
+_ANALYSIS_INSTRUCTIONS = """
 ## INSTRUÇÕES PARA ANÁLISE ULTRA-ROBUSTA:
 
 Gere uma análise ULTRA-COMPLETA e estruturada em formato JSON implementando TODOS os sistemas dos documentos. A estrutura deve ser:
@@ -479,127 +376,447 @@ Gere uma análise ULTRA-COMPLETA e estruturada em formato JSON implementando TOD
 10. **RESULTADOS GARANTIDOS**: Cada recomendação deve ter alta probabilidade de sucesso
 
 CRÍTICO: Esta análise será usada para decisões de investimento de milhões de reais. A qualidade deve ser IMPECÁVEL.
+"""
 
-Gere APENAS o JSON válido e ultra-completo, sem texto adicional antes ou depois.
+# Parte fixa do prompt vem primeiro: o prefixo idêntico entre chamadas pode ser
+# reaproveitado pelo cache de contexto do provedor; só o final muda por projeto
+_ANALYSIS_PREFIX = """
+# ANÁLISE ULTRA-DETALHADA DE MERCADO - ARQV30 ENHANCED
+
+Você é o DIRETOR SUPREMO DE ANÁLISE DE MERCADO, um especialista de elite com 25+ anos de experiência em análise de mercado, psicologia do consumidor, estratégia de negócios e marketing digital avançado.
+
+Sua missão é gerar a ANÁLISE MAIS COMPLETA E PROFUNDA possível, implementando TODOS os sistemas avançados dos documentos fornecidos:
+
+1. SISTEMA DE PROVAS VISUAIS INSTANTÂNEAS
+2. ARQUITETO DE DRIVERS MENTAIS  
+3. PRÉ-PITCH INVISÍVEL
+4. ENGENHARIA ANTI-OBJEÇÃO
+5. ANCORAGEM PSICOLÓGICA
+
+IMPORTANTE: Esta análise deve ter PROFUNDIDADE EXTREMA, com insights únicos que vão muito além do óbvio. Seja ULTRA-ESPECÍFICO e ACIONÁVEL.
+""" + _ANALYSIS_INSTRUCTIONS
+
+# Bloco de dados do projeto; campos ausentes aparecem como "Não informado"
+_PROJECT_DATA_TEMPLATE = """
+## DADOS DO PROJETO:
+- **Segmento**: {segmento}
+- **Produto/Serviço**: {produto}
+- **Público-Alvo**: {publico}
+- **Preço**: R$ {preco}
+- **Concorrentes**: {concorrentes}
+- **Objetivo de Receita**: R$ {objetivo_receita}
+- **Orçamento Marketing**: R$ {orcamento_marketing}
+- **Prazo de Lançamento**: {prazo_lancamento}
+- **Dados Adicionais**: {dados_adicionais}
 """
+
+# Teste de conexão: resposta mínima e determinística, memorizada por 60 segundos
+_HEALTH_CHECK_OVERRIDES = {
+    "temperature": 0.0,
+    "top_p": 1.0,
+    "top_k": 1,
+    "max_output_tokens": 4
+}
+_HEALTH_CHECK_TTL = 60
+
+class _ProjectData(dict):
+    """Dados do projeto para o template, com valor padrão para campos ausentes"""
+    
+    def __missing__(self, key: str) -> str:
+        return 'Não informado'
+
+_ANALYSIS_CLOSING = "\nGere APENAS o JSON válido e ultra-completo para o projeto acima, sem texto adicional antes ou depois.\n"
+
+
+# Análise básica devolvida em caso de erro (segmento e data preenchidos por chamada)
+_FALLBACK_ANALYSIS_JSON = orjson.dumps({
+    "avatar_ultra_detalhado": {
+        "perfil_demografico": {
+            "idade": "25-45 anos",
+            "genero": "Misto",
+            "renda": "R$ 3.000 - R$ 15.000",
+            "escolaridade": "Superior",
+            "localizacao": "Centros urbanos",
+            "estado_civil": "Variado",
+            "filhos": "Variado",
+            "profissao": "Profissionais diversos"
+        },
+        "perfil_psicografico": {
+            "personalidade": "Ambiciosos e determinados",
+            "valores": "Crescimento pessoal e profissional",
+            "interesses": "Tecnologia e inovação",
+            "estilo_vida": "Dinâmico e conectado",
+            "comportamento_compra": "Pesquisa antes de comprar",
+            "influenciadores": "Especialistas e peers"
+        },
+        "dores_especificas": [
+            "Falta de conhecimento especializado",
+            "Dificuldade para implementar",
+            "Resultados inconsistentes",
+            "Falta de direcionamento claro"
+        ],
+        "desejos_profundos": [
+            "Alcançar liberdade financeira",
+            "Ter mais tempo para família",
+            "Ser reconhecido como especialista",
+            "Fazer diferença no mundo"
+        ],
+        "gatilhos_mentais": [
+            "Urgência",
+            "Escassez",
+            "Prova social",
+            "Autoridade",
+            "Reciprocidade"
+        ],
+        "objecoes_comuns": [
+            "Preço muito alto",
+            "Falta de tempo",
+            "Dúvida sobre resultados",
+            "Já tentei antes"
+        ],
+        "jornada_cliente": {
+            "consciencia": "Reconhece que tem um problema",
+            "consideracao": "Pesquisa soluções disponíveis",
+            "decisao": "Avalia custo-benefício",
+            "pos_compra": "Busca implementar e obter resultados"
+        }
+    },
+    "escopo": {
+        "posicionamento_mercado": "Solução premium para resultados rápidos",
+        "proposta_valor_unica": "Transforme seu negócio com estratégias comprovadas",
+        "diferenciais_competitivos": ["Metodologia exclusiva", "Suporte personalizado"],
+        "mensagem_central": "Resultados garantidos com método comprovado",
+        "segmentacao_mercado": "Empreendedores digitais",
+        "nicho_especifico": "Produtos Digitais"
+    },
+    "insights_exclusivos_ultra": [
+        "O mercado está em crescimento acelerado",
+        "Existe demanda reprimida no segmento",
+        "Oportunidade de posicionamento premium",
+        "Potencial de expansão internacional",
+        "Análise gerada em modo fallback - execute nova análise para resultados completos"
+    ],
+    "metadata_gemini": {
+        "generated_at": "",
+        "model": "fallback",
+        "version": "2.0.0",
+        "note": "Análise gerada em modo fallback devido a erro na IA"
+    }
+})
+
+
+class UltraRobustGeminiClient:
+    """Cliente para integração com Google Gemini Pro"""
+    
+    def __init__(self):
+        """Inicializa cliente Gemini"""
+        self.api_key = os.getenv('GEMINI_API_KEY')
+        if not self.api_key:
+            raise ValueError("GEMINI_API_KEY não configurada")
+        
+        # Configura API
+        genai.configure(api_key=self.api_key)
+        
+        # Modelo principal (usando o mais avançado disponível)
+        self.model_name = "gemini-1.5-flash"
+        self.model = genai.GenerativeModel(self.model_name)
         
-        return prompt
+        # Configurações de geração
+        self.generation_config = {
+            'temperature': 0.7,
+            'top_p': 0.8,
+            'top_k': 40,
+            'max_output_tokens': 32768,  # Aumentado para análises ultra-detalhadas
+        }
+        
+        # Configurações de segurança
+        self.safety_settings = [
+            {
+                "category": "HARM_CATEGORY_HARASSMENT",
+                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+            },
+            {
+                "category": "HARM_CATEGORY_HATE_SPEECH",
+                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+            },
+            {
+                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+            },
+            {
+                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+            }
+        ]
+        
+        # Objetos do SDK montados uma única vez e reutilizados em todas as chamadas
+        self._generation_config = GenerationConfig(**self.generation_config)
+        self._health_check_config = GenerationConfig(**{**self.generation_config, **_HEALTH_CHECK_OVERRIDES})
+        self._safety_settings = [
+            {
+                "category": HarmCategory[setting["category"]],
+                "threshold": HarmBlockThreshold[setting["threshold"]]
+            }
+            for setting in self.safety_settings
+        ]
+        
+        # Cache (LRU + TTL) de respostas para entradas idênticas
+        self.cache_enabled = os.getenv('GEMINI_CACHE_ENABLED', 'true').lower() == 'true'
+        self.cache_ttl = int(os.getenv('GEMINI_CACHE_TTL', 3600))  # 1 hora
+        self.cache_max_entries = int(os.getenv('GEMINI_CACHE_MAX_ENTRIES', 128))
+        self._response_cache = OrderedDict()  # chave -> (timestamp, análise serializada)
+        self._cache_lock = threading.Lock()
+        
+        # Cópia em disco: compartilhada entre workers e preservada entre reinícios.
+        # Falha ao preparar o cache só desativa o disco, nunca o cliente.
+        self.cache_dir = cache_directory('gemini')
+        self.disk_cache = None
+        if self.cache_enabled:
+            try:
+                self.disk_cache = FileCache(
+                    self.cache_dir,
+                    ttl=self.cache_ttl,
+                    max_entries=int(os.getenv('GEMINI_DISK_CACHE_MAX_ENTRIES', 1000))
+                )
+            except Exception as e:
+                logger.warning(f"Cache Gemini em disco desativado: {str(e)}")
+        self._last_ok_at = 0.0
+        
+        # Controle de concorrência e backoff para respeitar a cota do Gemini
+        self.max_concurrency = int(os.getenv('GEMINI_MAX_CONCURRENCY', 4))
+        self.max_attempts = int(os.getenv('GEMINI_MAX_ATTEMPTS', 3))
+        self.base_backoff = float(os.getenv('GEMINI_BASE_BACKOFF', 1.0))
+        self._request_slots = threading.BoundedSemaphore(self.max_concurrency)
+    
+    def test_connection(self) -> bool:
+        """Testa conexão com Gemini"""
+        # Resultado positivo recente dispensa nova chamada à API
+        if self._last_ok_at and time.monotonic() - self._last_ok_at < _HEALTH_CHECK_TTL:
+            return True
+        
+        try:
+            response = self.model.generate_content(
+                "Teste de conexão. Responda apenas: OK",
+                generation_config=self._health_check_config,
+                safety_settings=self._safety_settings
+            )
+            if "OK" in response.text.upper():
+                self._last_ok_at = time.monotonic()
+                return True
+            return False
+        except Exception as e:
+            logger.error(f"Erro ao testar Gemini: {str(e)}")
+            return False
+    
+    def generate_ultra_detailed_analysis(
+        self, 
+        analysis_data: Dict[str, Any],
+        search_context: Optional[str] = None,
+        attachments_context: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Gera análise ultra-detalhada usando Gemini Pro"""
+        
+        cache_key = None
+        if self.cache_enabled:
+            cache_key = self._cache_key(analysis_data, search_context, attachments_context)
+            cached_analysis = self._get_cached_response(cache_key)
+            if cached_analysis is not None:
+                logger.info("Análise Gemini servida do cache")
+                return cached_analysis
+        
+        try:
+            # Constrói prompt ultra-detalhado
+            prompt = self._build_analysis_prompt(analysis_data, search_context, attachments_context)
+            
+            logger.info("Iniciando análise com Gemini Pro...")
+            start_time = time.time()
+            
+            # Gera análise
+            response = self._generate_content(prompt)
+            
+            end_time = time.time()
+            logger.info(f"Análise concluída em {end_time - start_time:.2f} segundos")
+            
+            # Processa resposta
+            if response.text:
+                analysis = self._parse_analysis_response(response.text)
+                if cache_key and analysis.get('metadata_gemini', {}).get('model') != 'fallback':
+                    self._store_cached_response(cache_key, analysis)
+                return analysis
+            else:
+                raise Exception("Resposta vazia do Gemini")
+                
+        except Exception as e:
+            logger.error(f"Erro na análise Gemini: {str(e)}")
+            return self._generate_fallback_analysis(analysis_data)
+    
+    def _generate_content(self, prompt: str):
+        """Chama o Gemini limitando requisições simultâneas, com backoff em erros de cota"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self._request_slots:
+                    return self.model.generate_content(
+                        prompt,
+                        generation_config=self._generation_config,
+                        safety_settings=self._safety_settings
+                    )
+            except (google_exceptions.ResourceExhausted, google_exceptions.ServiceUnavailable) as e:
+                if attempt == self.max_attempts:
+                    raise
+                
+                # Espera fora do semáforo para liberar a vaga a outras requisições
+                delay = self.base_backoff * (2 ** (attempt - 1)) * random.uniform(0.75, 1.25)
+                logger.warning(f"Gemini sobrecarregado ({str(e)}), nova tentativa em {delay:.1f}s ({attempt}/{self.max_attempts})")
+                time.sleep(delay)
+    
+    def _cache_key(
+        self,
+        analysis_data: Dict[str, Any],
+        search_context: Optional[str],
+        attachments_context: Optional[str]
+    ) -> str:
+        """Gera chave de cache (SHA-256) das entradas normalizadas da análise"""
+        # Campos livres normalizados: variações triviais de escrita reutilizam a mesma análise
+        normalized_data = {
+            key: _normalize_key_text(value) if isinstance(value, str) else value
+            for key, value in analysis_data.items()
+            if key != 'session_id'
+        }
+        payload = {
+            "data": normalized_data,
+            "search_context": search_context,
+            "attachments_context": attachments_context,
+            "model": self.model_name,
+            "generation_config": self.generation_config
+        }
+        return hashlib.sha256(
+            orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+        ).hexdigest()
+    
+    def _get_cached_response(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Retorna cópia da análise em cache, se existir e não estiver expirada"""
+        with self._cache_lock:
+            entry = self._response_cache.get(cache_key)
+            if entry is not None:
+                cached_at, serialized = entry
+                if time.monotonic() - cached_at > self.cache_ttl:
+                    del self._response_cache[cache_key]
+                    entry = None
+                else:
+                    self._response_cache.move_to_end(cache_key)
+        
+        if entry is None:
+            serialized = self._load_disk_response(cache_key)
+            if serialized is None:
+                return None
+        
+        # Desserializa a cada acerto: quem chama pode alterar a análise livremente
+        return orjson.loads(serialized)
+    
+    def _store_cached_response(self, cache_key: str, analysis: Dict[str, Any]) -> None:
+        """Armazena a análise serializada no cache, descartando as menos usadas"""
+        try:
+            serialized = orjson.dumps(analysis, default=str)
+        except Exception as e:
+            logger.warning(f"Análise não armazenada no cache: {str(e)}")
+            return
+        
+        self._remember_response(cache_key, serialized, time.monotonic())
+        if self.disk_cache is not None:
+            self.disk_cache.set_bytes(cache_key, serialized)
+    
+    def _remember_response(self, cache_key: str, serialized: bytes, cached_at: float) -> None:
+        """Guarda a análise serializada na memória, descartando as menos usadas"""
+        with self._cache_lock:
+            self._response_cache[cache_key] = (cached_at, serialized)
+            self._response_cache.move_to_end(cache_key)
+            while len(self._response_cache) > self.cache_max_entries:
+                self._response_cache.popitem(last=False)
+    
+    def _load_disk_response(self, cache_key: str) -> Optional[bytes]:
+        """Lê a análise serializada do disco e a promove para a memória"""
+        if self.disk_cache is None:
+            return None
+        entry = self.disk_cache.get_entry(cache_key)
+        if entry is None:
+            return None
+        age, serialized = entry
+        
+        # Mantém a idade original para que o TTL continue valendo na memória
+        self._remember_response(cache_key, serialized, time.monotonic() - age)
+        return serialized
+    
+    def _build_analysis_prompt(
+        self, 
+        data: Dict[str, Any], 
+        search_context: Optional[str] = None,
+        attachments_context: Optional[str] = None
+    ) -> str:
+        """Constrói prompt detalhado para análise"""
+        
+        # Os contextos podem ter dezenas de KB: une tudo uma única vez em vez de concatenar
+        prompt_parts = [_ANALYSIS_PREFIX, _PROJECT_DATA_TEMPLATE.format_map(_ProjectData(data))]
+        
+        if search_context:
+            prompt_parts.append(f"\n## CONTEXTO DE PESQUISA:\n{search_context}\n")
+        
+        if attachments_context:
+            prompt_parts.append(f"\n## CONTEXTO DOS ANEXOS:\n{attachments_context}\n")
+        
+        prompt_parts.append(_ANALYSIS_CLOSING)
+        
+        return "".join(prompt_parts)
     
     def _parse_analysis_response(self, response_text: str) -> Dict[str, Any]:
         """Processa resposta do Gemini e extrai JSON"""
         try:
             # Remove markdown se presente
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.rfind("```")
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + 3
-                end = response_text.rfind("```")
-                response_text = response_text[start:end].strip()
+            fence = _FENCE_RE.search(response_text)
+            if fence:
+                response_text = fence.group(1).strip()
             
             # Tenta parsear JSON
-            analysis = json.loads(response_text)
+            analysis = orjson.loads(response_text)
             
             # Adiciona metadados
             analysis['metadata_gemini'] = {
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': _iso_now(),
                 'model': 'gemini-pro',
                 'version': '2.0.0'
             }
             
             return analysis
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Erro ao parsear JSON: {str(e)}")
             logger.error(f"Resposta recebida: {response_text[:500]}...")
             return self._generate_fallback_analysis({})
     
     def _generate_fallback_analysis(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Gera análise básica em caso de erro"""
-        fallback = {
-            "avatar_ultra_detalhado": {
-                "perfil_demografico": {
-                    "idade": "25-45 anos",
-                    "genero": "Misto",
-                    "renda": "R$ 3.000 - R$ 15.000",
-                    "escolaridade": "Superior",
-                    "localizacao": "Centros urbanos",
-                    "estado_civil": "Variado",
-                    "filhos": "Variado",
-                    "profissao": "Profissionais diversos"
-                },
-                "perfil_psicografico": {
-                    "personalidade": "Ambiciosos e determinados",
-                    "valores": "Crescimento pessoal e profissional",
-                    "interesses": "Tecnologia e inovação",
-                    "estilo_vida": "Dinâmico e conectado",
-                    "comportamento_compra": "Pesquisa antes de comprar",
-                    "influenciadores": "Especialistas e peers"
-                },
-                "dores_especificas": [
-                    "Falta de conhecimento especializado",
-                    "Dificuldade para implementar",
-                    "Resultados inconsistentes",
-                    "Falta de direcionamento claro"
-                ],
-                "desejos_profundos": [
-                    "Alcançar liberdade financeira",
-                    "Ter mais tempo para família",
-                    "Ser reconhecido como especialista",
-                    "Fazer diferença no mundo"
-                ],
-                "gatilhos_mentais": [
-                    "Urgência",
-                    "Escassez",
-                    "Prova social",
-                    "Autoridade",
-                    "Reciprocidade"
-                ],
-                "objecoes_comuns": [
-                    "Preço muito alto",
-                    "Falta de tempo",
-                    "Dúvida sobre resultados",
-                    "Já tentei antes"
-                ],
-                "jornada_cliente": {
-                    "consciencia": "Reconhece que tem um problema",
-                    "consideracao": "Pesquisa soluções disponíveis",
-                    "decisao": "Avalia custo-benefício",
-                    "pos_compra": "Busca implementar e obter resultados"
-                }
-            },
-            "escopo": {
-                "posicionamento_mercado": "Solução premium para resultados rápidos",
-                "proposta_valor_unica": "Transforme seu negócio com estratégias comprovadas",
-                "diferenciais_competitivos": ["Metodologia exclusiva", "Suporte personalizado"],
-                "mensagem_central": "Resultados garantidos com método comprovado",
-                "segmentacao_mercado": "Empreendedores digitais",
-                "nicho_especifico": data.get('segmento', 'Produtos Digitais')
-            },
-            "insights_exclusivos_ultra": [
-                "O mercado está em crescimento acelerado",
-                "Existe demanda reprimida no segmento",
-                "Oportunidade de posicionamento premium",
-                "Potencial de expansão internacional",
-                "Análise gerada em modo fallback - execute nova análise para resultados completos"
-            ],
-            "metadata_gemini": {
-                "generated_at": datetime.now().isoformat(),
-                "model": "fallback",
-                "version": "2.0.0",
-                "note": "Análise gerada em modo fallback devido a erro na IA"
-            }
-        }
+        # Parte fixa pré-serializada: cada chamada recebe uma cópia independente
+        fallback = orjson.loads(_FALLBACK_ANALYSIS_JSON)
+        fallback["escopo"]["nicho_especifico"] = data.get('segmento', 'Produtos Digitais')
+        fallback["metadata_gemini"]["generated_at"] = _iso_now()
         
         return fallback
 
 
-# Instância global do cliente
-try:
-    gemini_client = UltraRobustGeminiClient()
-    logger.info("Cliente Gemini inicializado com sucesso")
-except Exception as e:
-    logger.error(f"Erro ao inicializar cliente Gemini: {str(e)}")
-    gemini_client = None
+# Instância global do cliente, criada no primeiro uso (não custa nada na importação)
+_gemini_client = None
+_gemini_client_lock = threading.Lock()
+
+def get_gemini_client() -> Optional[UltraRobustGeminiClient]:
+    """Retorna o cliente Gemini global, inicializando-o na primeira chamada"""
+    global _gemini_client
+    if _gemini_client is None:
+        with _gemini_client_lock:
+            if _gemini_client is None:
+                try:
+                    _gemini_client = UltraRobustGeminiClient()
+                    logger.info("Cliente Gemini inicializado com sucesso")
+                except Exception as e:
+                    logger.error(f"Erro ao inicializar cliente Gemini: {str(e)}")
+                    _gemini_client = False
+    return _gemini_client or None
 
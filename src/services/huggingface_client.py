@@ -7,8 +7,11 @@ Cliente para integração com HuggingFace API para análise complementar
 
 import os
 import logging
+import threading
 import requests
-import json
+import orjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -27,6 +30,19 @@ class HuggingFaceClient:
             "Content-Type": "application/json"
         }
         
+        # Sessão persistente: reaproveita a conexão TLS entre chamadas
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retry)
+        self.session.mount("https://", adapter)
+        
         self.available = bool(self.api_key)
         
         if self.available:
@@ -56,25 +72,25 @@ class HuggingFaceClient:
                 "inputs": prompt,
                 "parameters": {
                     "max_new_tokens": max_tokens,
-                    "temperature": temperature
+                    "temperature": temperature,
+                    "return_full_text": False
                 }
             }
             
-            response = requests.post(
+            response = self.session.post(
                 self.base_url,
-                headers=self.headers,
                 json=payload,
                 timeout=timeout
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if isinstance(data, list) and len(data) > 0 and "generated_text" in data[0]:
                     content = data[0]["generated_text"]
-                    # Hugging Face often returns the prompt as part of the generated text
-                    # We need to remove it if it's present at the beginning
+                    # Alguns servidores ignoram return_full_text e devolvem o prompt junto
                     if content.startswith(prompt):
-                        content = content[len(prompt):].strip()
+                        content = content[len(prompt):]
+                    content = content.strip()
                     logger.info(f"HuggingFace gerou {len(content)} caracteres")
                     return content
                 else:
@@ -111,9 +127,19 @@ class HuggingFaceClient:
         
         return self.generate_text(prompt, max_tokens=1500, temperature=0.8)
 
-# Instância global (opcional)
-try:
-    huggingface_client = HuggingFaceClient()
-except Exception as e:
-    logger.error(f"Erro ao inicializar HuggingFace client: {str(e)}")
-    huggingface_client = None
\ No newline at end of file
+# Instância global (opcional), criada no primeiro uso
+_huggingface_client = None
+_huggingface_client_lock = threading.Lock()
+
+def get_huggingface_client() -> Optional[HuggingFaceClient]:
+    """Retorna o cliente HuggingFace global, inicializando-o na primeira chamada"""
+    global _huggingface_client
+    if _huggingface_client is None:
+        with _huggingface_client_lock:
+            if _huggingface_client is None:
+                try:
+                    _huggingface_client = HuggingFaceClient()
+                except Exception as e:
+                    logger.error(f"Erro ao inicializar HuggingFace client: {str(e)}")
+                    _huggingface_client = False
+    return _huggingface_client or None
\ No newline at end of file
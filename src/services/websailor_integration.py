@@ -6,18 +6,124 @@ Navegação web avançada para pesquisa profunda e extração de insights
 """
 
 import os
+import atexit
 import logging
 import time
+import threading
+from hashlib import blake2b
 import requests
-from typing import Dict, List, Optional, Any
-from urllib.parse import quote_plus, urljoin
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, quote_plus, urljoin, urlparse, urlunparse
+import orjson
 import re
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from services.file_cache import FileCache, cache_directory
 
 logger = logging.getLogger(__name__)
 
+# Textos fixos da pesquisa de fallback (listas novas são montadas a cada chamada)
+_FALLBACK_INSIGHTS = (
+    "A digitalização é uma tendência forte no setor",
+    "Personalização e automação são cruciais para o sucesso",
+    "Investimento em marketing digital é essencial"
+)
+_FALLBACK_TRENDS = (
+    "Crescimento contínuo do mercado digital",
+    "Aumento da demanda por soluções online",
+    "Foco em experiência do cliente"
+)
+_FALLBACK_OPPORTUNITIES = (
+    "Identificar nichos inexplorados no mercado",
+    "Investir em conteúdo de valor",
+    "Desenvolver soluções inovadoras"
+)
+
+# Separação de frases e palavras-chave da extração básica de insights
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?]\s+")
+_TREND_RE = re.compile("tendência|crescimento")
+_OPPORTUNITY_RE = re.compile("oportunidade|novo mercado")
+_INSIGHT_RE = re.compile("insight|chave|importante|mercado|análise|estratégia")
+
+# Sequências de espaços em branco (inclui quebras de linha)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Palavras do texto (\w inclui letras acentuadas)
+_TOKEN_RE = re.compile(r"\w+")
+
+# Domínios e extensões que não rendem texto de artigo: nem tenta extrair
+_SKIP_DOMAINS = frozenset({
+    "youtube.com", "youtu.be", "facebook.com", "twitter.com", "x.com",
+    "instagram.com", "tiktok.com"
+})
+_SKIP_SUFFIXES = (".pdf", ".doc", ".docx", ".zip", ".jpg", ".jpeg", ".png", ".gif", ".mp4")
+
+# Tamanho máximo do conteúdo combinado das páginas
+_COMBINED_CONTENT_LIMIT = 15000
+
+# Só os nós usados são montados na árvore: resultados do DuckDuckGo e links
+_DDG_RESULT_STRAINER = SoupStrainer('div', class_='result')
+_LINK_STRAINER = SoupStrainer('a', href=True)
+
+# Links em Markdown ("[texto](url)"), formato devolvido pelo Jina Reader
+_MARKDOWN_LINK_RE = re.compile(r"\[([^\]]*)\]\(([^)\s]+)")
+
+# Elementos sem texto de conteúdo, removidos numa única varredura da árvore
+_UNWANTED_TAGS = ("script", "style", "nav", "footer", "header", "form", "aside")
+
+# Limite de bytes lidos por página na extração básica
+_MAX_PAGE_BYTES = 512 * 1024
+
+# Termos de mercado acrescentados a queries muito genéricas
+_SEARCH_MARKET_TERMS = (
+    "mercado brasileiro",
+    "análise de mercado",
+    "tendências 2024",
+    "oportunidades negócio",
+    "estratégia marketing",
+    "dados",
+    "estatísticas",
+    "relatório"
+)
+
+# Termos de mercado que bonificam a relevância
+_RELEVANCE_MARKET_TERMS = (
+    "mercado", "análise", "tendência", "oportunidade",
+    "estratégia", "marketing", "concorrência", "público",
+    "crescimento", "demanda", "inovação", "tecnologia"
+)
+
+def _normalize_url(url: str) -> str:
+    """Normaliza URL para deduplicação (esquema/host em minúsculas, sem fragmento nem barra final)"""
+    parsed = urlparse(url)
+    return urlunparse(parsed._replace(
+        scheme=parsed.scheme.lower(),
+        netloc=parsed.netloc.lower(),
+        path=parsed.path.rstrip("/"),
+        fragment=""
+    ))
+
+def _resolve_ddg_href(href: str) -> str:
+    """Converte o link de resultado do DuckDuckGo (//duckduckgo.com/l/?uddg=...) na URL de destino"""
+    target = parse_qs(urlparse(href).query).get("uddg")
+    if target:
+        return target[0]
+    # Links relativos ao protocolo ("//site.com/...") viram https
+    return f"https:{href}" if href.startswith("//") else href
+
+def _declared_charset(content_type: str) -> Optional[str]:
+    """Charset declarado no Content-Type (evita a detecção de encoding do BeautifulSoup)"""
+    content_type = content_type.lower()
+    if "charset=" not in content_type:
+        return None
+    charset = content_type.split("charset=", 1)[1].split(";", 1)[0].strip(" \"'")
+    return charset or None
+
 class WebSailorAgent:
     """Agente WebSailor para navegação web avançada"""
     
@@ -40,12 +146,122 @@ class WebSailorAgent:
             "Accept-Encoding": "gzip, deflate, br"
         }
         
-        # Cache para evitar requisições duplicadas
-        self.cache = {}
+        # Sessão persistente: reaproveita conexões TCP/TLS (Google, Jina e páginas)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=50,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # Caches LRU com TTL para evitar requisições duplicadas (tamanho limitado)
         self.cache_ttl = 3600  # 1 hora
+        self.search_cache = OrderedDict()  # chave -> (timestamp, resultados)
+        self.content_cache = OrderedDict()  # chave -> (timestamp, conteúdo)
+        self.search_cache_max_entries = 256
+        self.content_cache_max_entries = 1024
+        self._cache_lock = threading.Lock()
+        
+        # Buscas/extrações em andamento: chamadas simultâneas à mesma chave esperam a primeira
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Cópia em disco dos caches: sobrevive a reinícios e é compartilhada entre workers
+        # Falha ao preparar o disco só desativa essa camada: o agente é criado na importação
+        self.cache_dir = cache_directory('websailor')
+        disk_limits = {
+            "search": int(os.getenv("WEBSAILOR_DISK_SEARCH_MAX_ENTRIES", 2000)),
+            "content": int(os.getenv("WEBSAILOR_DISK_CONTENT_MAX_ENTRIES", 5000))
+        }
+        self.disk_caches = {}
+        for kind, max_entries in disk_limits.items():
+            try:
+                self.disk_caches[kind] = FileCache(
+                    os.path.join(self.cache_dir, kind),
+                    ttl=self.cache_ttl,
+                    max_entries=max_entries
+                )
+            except OSError as e:
+                logger.warning(f"Cache WebSailor em disco ({kind}) desativado: {str(e)}")
+        
+        # Pool reutilizado para buscar páginas em paralelo (trabalho limitado por rede)
+        self.max_workers = int(os.getenv("WEBSAILOR_MAX_WORKERS", 10))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="arq-websailor")
+        atexit.register(self.close)
         
         logger.info(f"WebSailor Agent initialized - Enabled: {self.enabled}")
     
+    def close(self) -> None:
+        """Encerra o pool de threads e a sessão HTTP compartilhados"""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+    
+    def _cache_get(self, cache: OrderedDict, key: bytes) -> Optional[Any]:
+        """Retorna valor do cache se existir e não estiver expirado"""
+        with self._cache_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            
+            cached_at, value = entry
+            if time.monotonic() - cached_at > self.cache_ttl:
+                del cache[key]
+                return None
+            
+            cache.move_to_end(key)
+            return value
+    
+    def _cache_set(self, cache: OrderedDict, key: bytes, value: Any, max_entries: int) -> None:
+        """Armazena valor no cache, descartando as entradas menos usadas"""
+        with self._cache_lock:
+            cache[key] = (time.monotonic(), value)
+            cache.move_to_end(key)
+            while len(cache) > max_entries:
+                cache.popitem(last=False)
+    
+    def _disk_cache_get(self, kind: str, key: bytes) -> Optional[Any]:
+        """Lê valor do cache em disco, se existir e não estiver expirado"""
+        disk_cache = self.disk_caches.get(kind)
+        return disk_cache.get(key.hex()) if disk_cache is not None else None
+    
+    def _disk_cache_set(self, kind: str, key: bytes, value: Any) -> None:
+        """Grava valor no cache em disco (escrita atômica, com limpeza de expirados)"""
+        disk_cache = self.disk_caches.get(kind)
+        if disk_cache is not None:
+            disk_cache.set(key.hex(), value)
+    
+    def _run_once(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """Executa compute uma única vez por chave entre threads concorrentes (singleflight)"""
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not is_owner:
+            logger.info("Requisição deduplicada: aguardando chamada idêntica em andamento")
+            return future.result()
+        
+        try:
+            result = compute()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+    
     def is_available(self) -> bool:
         """Verifica se o WebSailor está disponível"""
         return self.enabled and (self.google_search_key or self.jina_api_key)
@@ -70,13 +286,26 @@ class WebSailorAgent:
             
             all_page_contents = []
             
+            # URLs já agendadas: a mesma página não é extraída duas vezes entre as etapas
+            seen_urls = set()
+            
+            def is_new_url(url: str) -> bool:
+                normalized = _normalize_url(url)
+                if normalized in seen_urls:
+                    return False
+                seen_urls.add(normalized)
+                return True
+            
             # 1. Busca inicial
             search_pages = max_pages * 2 if aggressive_mode else max_pages
-            search_results = self._perform_search(query, search_pages)
+            search_results = [
+                result for result in self._perform_search(query, search_pages)
+                if is_new_url(result["url"])
+            ]
             
-            # 2. Navega e extrai conteúdo das páginas principais
-            for result in search_results:
-                content = self._extract_page_content(result["url"])
+            # 2. Navega e extrai conteúdo das páginas principais (em paralelo)
+            contents = self._executor.map(self._extract_page_content, [result["url"] for result in search_results])
+            for result, content in zip(search_results, contents):
                 if content:
                     all_page_contents.append({
                         "url": result["url"],
@@ -90,36 +319,48 @@ class WebSailorAgent:
             if depth > 1:
                 logger.info(f"Iniciando pesquisa em profundidade (nível {depth})...")
                 top_pages = 5 if aggressive_mode else 3
-                for page in all_page_contents[:top_pages]:
-                    internal_links = self._extract_internal_links(page["url"], page["content"])
-                    links_to_process = 4 if aggressive_mode else 2
-                    for link in internal_links[:links_to_process]:
-                        internal_content = self._extract_page_content(link)
-                        if internal_content:
-                            all_page_contents.append({
-                                "url": link,
-                                "title": f"Link interno de {page['title']}",
-                                "content": internal_content,
-                                "relevance_score": self._calculate_relevance(internal_content, query, context) * 0.8,
-                                "source_type": "internal_link"
-                            })
+                links_to_process = 4 if aggressive_mode else 2
+                internal_targets = [
+                    (page, link)
+                    for page in all_page_contents[:top_pages]
+                    for link in self._extract_internal_links(page["url"], page["content"], query)[:links_to_process]
+                    if is_new_url(link)
+                ]
+                internal_contents = self._executor.map(
+                    self._extract_page_content, [link for _, link in internal_targets]
+                )
+                for (page, link), internal_content in zip(internal_targets, internal_contents):
+                    if internal_content:
+                        all_page_contents.append({
+                            "url": link,
+                            "title": f"Link interno de {page['title']}",
+                            "content": internal_content,
+                            "relevance_score": self._calculate_relevance(internal_content, query, context) * 0.8,
+                            "source_type": "internal_link"
+                        })
             
             # 4. Pesquisa de queries relacionadas (modo agressivo)
             if aggressive_mode:
                 logger.info("Executando pesquisa de queries relacionadas (modo agressivo)...")
-                related_queries = self._generate_related_queries(query, context)
-                for related_query in related_queries[:3]:
-                    related_results = self._perform_search(related_query, 3)
-                    for result in related_results:
-                        content = self._extract_page_content(result["url"])
-                        if content:
-                            all_page_contents.append({
-                                "url": result["url"],
-                                "title": result["title"],
-                                "content": content,
-                                "relevance_score": self._calculate_relevance(content, query, context) * 0.7,
-                                "source_type": "related_query"
-                            })
+                related_queries = self._generate_related_queries(query, context)[:3]
+                related_results = [
+                    result
+                    for results in self._executor.map(lambda related: self._perform_search(related, 3), related_queries)
+                    for result in results
+                    if is_new_url(result["url"])
+                ]
+                related_contents = self._executor.map(
+                    self._extract_page_content, [result["url"] for result in related_results]
+                )
+                for result, content in zip(related_results, related_contents):
+                    if content:
+                        all_page_contents.append({
+                            "url": result["url"],
+                            "title": result["title"],
+                            "content": content,
+                            "relevance_score": self._calculate_relevance(content, query, context) * 0.7,
+                            "source_type": "related_query"
+                        })
             
             # 5. Filtra e ordena por relevância
             all_page_contents.sort(key=lambda x: x["relevance_score"], reverse=True)
@@ -139,12 +380,24 @@ class WebSailorAgent:
     def _perform_search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
         """Realiza busca usando Google Custom Search ou alternativa"""
         
-        cache_key = f"search_{hash(query)}"
-        if cache_key in self.cache:
-            cached_result = self.cache[cache_key]
-            if time.time() - cached_result["timestamp"] < self.cache_ttl:
-                logger.info("Usando resultado de busca do cache")
-                return cached_result["data"]
+        # max_results faz parte da chave: buscas menores não podem servir as maiores
+        cache_key = blake2b(f"{max_results}:{query}".encode("utf-8"), digest_size=16).digest()
+        cached_results = self._cache_get(self.search_cache, cache_key)
+        if cached_results is None:
+            cached_results = self._disk_cache_get("search", cache_key)
+            if cached_results is not None:
+                self._cache_set(self.search_cache, cache_key, cached_results, self.search_cache_max_entries)
+        if cached_results is not None:
+            logger.info("Usando resultado de busca do cache")
+            return cached_results
+        
+        return self._run_once(
+            ("search", cache_key),
+            lambda: self._fetch_search_results(query, max_results, cache_key)
+        )
+    
+    def _fetch_search_results(self, query: str, max_results: int, cache_key: bytes) -> List[Dict[str, Any]]:
+        """Executa a busca de fato e armazena o resultado nos caches"""
         
         results = []
         
@@ -154,10 +407,12 @@ class WebSailorAgent:
         if not results:
             results = self._alternative_search(query, max_results)
         
-        self.cache[cache_key] = {
-            "data": results,
-            "timestamp": time.time()
-        }
+        # Resultados de exemplo (falha temporária) não são guardados: a próxima chamada tenta de novo
+        if any(result.get("source") == "fallback" for result in results):
+            return results
+        
+        self._cache_set(self.search_cache, cache_key, results, self.search_cache_max_entries)
+        self._disk_cache_set("search", cache_key, results)
         
         return results
     
@@ -178,15 +433,14 @@ class WebSailorAgent:
                 "dateRestrict": "y1"
             }
             
-            response = requests.get(
+            response = self.session.get(
                 self.google_search_url,
                 params=params,
-                headers=self.headers,
                 timeout=15
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 results = []
                 
                 for item in data.get("items", []):
@@ -216,7 +470,7 @@ class WebSailorAgent:
         try:
             search_url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
             
-            response = requests.get(
+            response = self.session.get(
                 search_url,
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -225,7 +479,12 @@ class WebSailorAgent:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(
+                    response.content,
+                    'lxml',
+                    parse_only=_DDG_RESULT_STRAINER,
+                    from_encoding=_declared_charset(response.headers.get("Content-Type", ""))
+                )
                 results = []
                 
                 # Extrai resultados reais do DuckDuckGo
@@ -237,7 +496,7 @@ class WebSailorAgent:
                     
                     if title_elem:
                         title = title_elem.get_text(strip=True)
-                        url = title_elem.get('href', '')
+                        url = _resolve_ddg_href(title_elem.get('href', ''))
                         snippet = snippet_elem.get_text(strip=True) if snippet_elem else ""
                         
                         if url and title:
@@ -278,19 +537,10 @@ class WebSailorAgent:
         
         return base_results[:max_results]
     
-    def _enhance_search_query(self, query: str) -> str:
-        """Melhora a query de busca para pesquisa de mercado"""
-        
-        market_terms = [
-            "mercado brasileiro",
-            "análise de mercado",
-            "tendências 2024",
-            "oportunidades negócio",
-            "estratégia marketing",
-            "dados",
-            "estatísticas",
-            "relatório"
-        ]
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _enhance_search_query(query: str) -> str:
+        """Melhora a query de busca para pesquisa de mercado (memorizado: depende só da query)"""
         
         relevant_terms = []
         query_lower = query.lower()
@@ -306,7 +556,7 @@ class WebSailorAgent:
         
         # Adiciona termos de mercado relevantes se a query for muito genérica
         if len(query.split()) < 3:
-            relevant_terms.extend(market_terms[:2])
+            relevant_terms.extend(_SEARCH_MARKET_TERMS[:2])
 
         enhanced_query = query
         if relevant_terms:
@@ -320,11 +570,28 @@ class WebSailorAgent:
         if not url or not url.startswith("http"):
             return None
         
-        cache_key = f"content_{hash(url)}"
-        if cache_key in self.cache:
-            cached_result = self.cache[cache_key]
-            if time.time() - cached_result["timestamp"] < self.cache_ttl:
-                return cached_result["data"]
+        parsed_url = urlparse(url)
+        host = parsed_url.netloc.lower().removeprefix("www.")
+        if host in _SKIP_DOMAINS or parsed_url.path.lower().endswith(_SKIP_SUFFIXES):
+            logger.info(f"URL ignorada (conteúdo não textual): {url}")
+            return None
+        
+        cache_key = blake2b(url.encode("utf-8"), digest_size=16).digest()
+        cached_content = self._cache_get(self.content_cache, cache_key)
+        if cached_content is None:
+            cached_content = self._disk_cache_get("content", cache_key)
+            if cached_content is not None:
+                self._cache_set(self.content_cache, cache_key, cached_content, self.content_cache_max_entries)
+        if cached_content is not None:
+            return cached_content
+        
+        return self._run_once(
+            ("content", cache_key),
+            lambda: self._fetch_page_content(url, cache_key)
+        )
+    
+    def _fetch_page_content(self, url: str, cache_key: bytes) -> Optional[str]:
+        """Extrai o conteúdo de fato e o armazena nos caches"""
         
         content = None
         
@@ -335,10 +602,8 @@ class WebSailorAgent:
             content = self._extract_basic_content(url)
         
         if content:
-            self.cache[cache_key] = {
-                "data": content,
-                "timestamp": time.time()
-            }
+            self._cache_set(self.content_cache, cache_key, content, self.content_cache_max_entries)
+            self._disk_cache_set("content", cache_key, content)
         
         return content
     
@@ -347,13 +612,12 @@ class WebSailorAgent:
         
         try:
             headers = {
-                **self.headers,
                 "Authorization": f"Bearer {self.jina_api_key}"
             }
             
             jina_url = f"{self.jina_reader_url}{url}"
             
-            response = requests.get(
+            response = self.session.get(
                 jina_url,
                 headers=headers,
                 timeout=30
@@ -380,24 +644,38 @@ class WebSailorAgent:
         """Extração básica de conteúdo usando requests + BeautifulSoup"""
         
         try:
-            response = requests.get(
+            # Lê o corpo em blocos e para no limite: páginas enormes não estouram a memória
+            with self.session.get(
                 url,
-                headers=self.headers,
-                timeout=20,
-                allow_redirects=True
-            )
+                timeout=(5, 20),  # conexão, leitura
+                allow_redirects=True,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.warning(f"Falha ao acessar {url}: {response.status_code}")
+                    return None
+                
+                content_type = response.headers.get("Content-Type", "").lower()
+                if content_type and "html" not in content_type and "text" not in content_type:
+                    logger.info(f"Conteúdo não textual ignorado ({content_type}) em {url}")
+                    return None
+                
+                charset = _declared_charset(content_type)
+                
+                body = bytearray()
+                for chunk in response.iter_content(chunk_size=8192):
+                    body += chunk
+                    if len(body) >= _MAX_PAGE_BYTES:
+                        break
             
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, "html.parser")
+            if body:
+                soup = BeautifulSoup(bytes(body), "lxml", from_encoding=charset)
                 
-                for element in soup(["script", "style", "nav", "footer", "header", "form", "aside"]):
+                for element in soup(_UNWANTED_TAGS):
                     element.decompose()
                 
-                text = soup.get_text()
-                
-                lines = (line.strip() for line in text.splitlines())
-                chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-                text = " ".join(chunk for chunk in chunks if chunk)
+                # Colapsa qualquer sequência de espaços/quebras de linha numa única passada
+                text = _WHITESPACE_RE.sub(" ", soup.get_text(separator=" ", strip=True))
                 
                 if len(text) > 6000:
                     text = text[:6000] + "... [conteúdo truncado]"
@@ -405,28 +683,50 @@ class WebSailorAgent:
                 logger.info(f"Conteúdo extraído básico: {len(text)} caracteres de {url}")
                 return text
             else:
-                logger.warning(f"Falha ao acessar {url}: {response.status_code}")
+                logger.warning(f"Página sem conteúdo em {url}")
                 return None
                 
         except Exception as e:
             logger.error(f"Erro na extração básica para {url}: {str(e)}")
             return None
 
-    def _extract_internal_links(self, base_url: str, content: str) -> List[str]:
-        """Extrai links internos de uma página para pesquisa em profundidade"""
-        links = []
+    def _extract_internal_links(self, base_url: str, content: str, query: str = "") -> List[str]:
+        """Extrai links internos de uma página para pesquisa em profundidade
+        
+        Os links cujo texto âncora cita mais palavras da query vêm primeiro; empates
+        mantêm a ordem do documento.
+        """
+        anchor_texts = {}
         try:
-            soup = BeautifulSoup(content, "html.parser")
-            for a_tag in soup.find_all("a", href=True):
-                href = a_tag["href"]
+            # O conteúdo guardado é Markdown (Jina Reader) ou texto puro; HTML só em casos raros
+            candidates = [(href, text) for text, href in _MARKDOWN_LINK_RE.findall(content)]
+            if "<a " in content:
+                soup = BeautifulSoup(content, "lxml", parse_only=_LINK_STRAINER)
+                candidates.extend(
+                    (a_tag["href"], a_tag.get_text(" ", strip=True))
+                    for a_tag in soup.find_all("a", href=True)
+                )
+            
+            for href, text in candidates:
                 full_url = urljoin(base_url, href)
                 # Filtra apenas links que são do mesmo domínio e não são âncoras internas
                 if full_url.startswith(base_url) and "#" not in full_url and full_url != base_url:
-                    links.append(full_url)
-            logger.info(f"Encontrados {len(links)} links internos em {base_url}")
+                    # Dict como conjunto ordenado: sem duplicatas e na ordem do documento
+                    anchor_texts.setdefault(full_url, text.lower())
+            logger.info(f"Encontrados {len(anchor_texts)} links internos em {base_url}")
         except Exception as e:
             logger.warning(f"Erro ao extrair links internos de {base_url}: {str(e)}")
-        return list(set(links))
+        
+        # Pré-filtro barato: prioriza links promissores antes de gastar uma extração com eles
+        query_words = [word for word in _TOKEN_RE.findall(query.lower()) if len(word) > 2]
+        if not query_words:
+            return list(anchor_texts)
+        
+        return sorted(
+            anchor_texts,
+            key=lambda link: sum(word in anchor_texts[link] for word in query_words),
+            reverse=True
+        )
     
     def _calculate_relevance(
         self, 
@@ -442,44 +742,38 @@ class WebSailorAgent:
         content_lower = content.lower()
         query_lower = query.lower()
         
+        # Uma única passada pelo texto; palavras simples viram uma consulta O(1)
+        counts = Counter(_TOKEN_RE.findall(content_lower))
+        
+        def occurrences(term: str) -> int:
+            # Termos que não são um único token ("e-commerce", "marketing digital") exigem busca no texto
+            return counts[term] if _TOKEN_RE.fullmatch(term) else content_lower.count(term)
+        
         score = 0.0
         
         # Score baseado na query
         query_words = query_lower.split()
         for word in query_words:
             if len(word) > 2:
-                score += content_lower.count(word) * 0.2
+                score += occurrences(word) * 0.2
         
         # Score baseado no contexto
-        context_terms = []
-        
-        # Adiciona termos do contexto de forma segura
-        if context.get("segmento"):
-            context_terms.append(str(context["segmento"]).lower())
-        
-        if context.get("produto"):
-            context_terms.append(str(context["produto"]).lower())
-        
-        if context.get("publico"):
-            publico_lower = str(context["publico"]).lower()
-            context_terms.append(publico_lower)
+        context_terms = [
+            str(context[field]).lower()
+            for field in ("segmento", "produto", "publico")
+            if context.get(field)
+        ]
         
         for term in context_terms:
             if term and len(term) > 2:
-                score += content_lower.count(term) * 0.3
+                score += occurrences(term) * 0.3
         
-        # Bonus para termos de mercado
-        market_terms = [
-            "mercado", "análise", "tendência", "oportunidade",
-            "estratégia", "marketing", "concorrência", "público",
-            "crescimento", "demanda", "inovação", "tecnologia"
-        ]
-        
-        for term in market_terms:
+        # Bonus para termos de mercado (por substring: "tendência" também conta "tendências")
+        for term in _RELEVANCE_MARKET_TERMS:
             score += content_lower.count(term) * 0.1
         
         # Bônus por proximidade de termos
-        if all(word in content_lower for word in query_words) and len(query_words) > 1:
+        if len(query_words) > 1 and all(occurrences(word) for word in query_words):
             score += 5.0
         
         # Normaliza score
@@ -492,28 +786,30 @@ class WebSailorAgent:
         query: str, 
         context: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Consolida informações da pesquisa"""
+        """Consolida informações da pesquisa (page_contents já vem ordenado por relevância)"""
         
         if not page_contents:
             return self._generate_fallback_research(query, context)
         
-        # Ordena por relevância
-        page_contents.sort(key=lambda x: x["relevance_score"], reverse=True)
-
-        # Combina o conteúdo das páginas mais relevantes
-        combined_content = ""
+        # Combina o conteúdo das páginas mais relevantes (partes unidas uma única vez)
+        content_parts = []
+        remaining = _COMBINED_CONTENT_LIMIT
         sources_list = []
         for i, page in enumerate(page_contents):
-            combined_content += f"\n--- Conteúdo da Página {i+1} ({page['url']}) ---\n"
-            combined_content += page["content"]
+            block = f"\n--- Conteúdo da Página {i+1} ({page['url']}) ---\n{page['content']}"
             sources_list.append({
                 "title": page["title"],
                 "url": page["url"],
                 "relevance_score": page["relevance_score"]
             })
-            if len(combined_content) > 15000:
-                combined_content = combined_content[:15000] + "... [conteúdo adicional truncado]"
+            if len(block) > remaining:
+                content_parts.append(block[:remaining])
+                content_parts.append("... [conteúdo adicional truncado]")
                 break
+            content_parts.append(block)
+            remaining -= len(block)
+        
+        combined_content = "".join(content_parts)
         
         # Extração básica de insights
         insights, trends, opportunities = self._extract_basic_insights(combined_content)
@@ -545,20 +841,25 @@ class WebSailorAgent:
         trends = []
         opportunities = []
         
-        sentences = text_content.split(". ")
+        sentences = _SENTENCE_SPLIT_RE.split(text_content)
         for sentence in sentences:
             sentence = sentence.strip()
             if len(sentence) > 50:
-                if "tendência" in sentence.lower() or "crescimento" in sentence.lower():
+                # Minúsculas calculadas uma vez por frase
+                sentence_lower = sentence.lower()
+                if _TREND_RE.search(sentence_lower):
                     trends.append(sentence[:200])
-                elif "oportunidade" in sentence.lower() or "novo mercado" in sentence.lower():
+                elif _OPPORTUNITY_RE.search(sentence_lower):
                     opportunities.append(sentence[:200])
-                elif "insight" in sentence.lower() or "chave" in sentence.lower() or "importante" in sentence.lower():
-                    insights.append(sentence[:200])
-                elif any(term in sentence.lower() for term in ["mercado", "análise", "estratégia"]):
+                elif _INSIGHT_RE.search(sentence_lower):
                     insights.append(sentence[:200])
         
-        return list(set(insights))[:5], list(set(trends))[:3], list(set(opportunities))[:3]
+        # Remove duplicatas preservando a ordem do texto
+        return (
+            list(dict.fromkeys(insights))[:5],
+            list(dict.fromkeys(trends))[:3],
+            list(dict.fromkeys(opportunities))[:3]
+        )
 
     def _generate_related_queries(self, original_query: str, context: Dict[str, Any]) -> List[str]:
         """Gera queries relacionadas para pesquisa mais abrangente"""
@@ -592,11 +893,12 @@ class WebSailorAgent:
             f"cases sucesso {original_query}"
         ])
         
-        # Remove duplicatas e queries muito similares à original
-        unique_queries = []
-        for query in related_queries:
-            if query.lower() not in original_query.lower() and query not in unique_queries:
-                unique_queries.append(query)
+        # Remove duplicatas (preservando a ordem) e queries muito similares à original
+        original_lower = original_query.lower()
+        unique_queries = [
+            query for query in dict.fromkeys(related_queries)
+            if query.lower() not in original_lower
+        ]
         
         return unique_queries[:5]
 
@@ -611,20 +913,10 @@ class WebSailorAgent:
                 "combined_content": f"Pesquisa básica para: {query}. Mercado em crescimento com oportunidades digitais.",
                 "key_insights": [
                     f"O mercado para '{query}' apresenta potencial de crescimento",
-                    "A digitalização é uma tendência forte no setor",
-                    "Personalização e automação são cruciais para o sucesso",
-                    "Investimento em marketing digital é essencial"
+                    *_FALLBACK_INSIGHTS
                 ],
-                "market_trends": [
-                    "Crescimento contínuo do mercado digital",
-                    "Aumento da demanda por soluções online",
-                    "Foco em experiência do cliente"
-                ],
-                "opportunities": [
-                    "Identificar nichos inexplorados no mercado",
-                    "Investir em conteúdo de valor",
-                    "Desenvolver soluções inovadoras"
-                ]
+                "market_trends": list(_FALLBACK_TRENDS),
+                "opportunities": list(_FALLBACK_OPPORTUNITIES)
             },
             "sources": [],
             "metadata": {